@@ -3,9 +3,15 @@ import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory, jsonify, request
+from flask import Flask, send_from_directory, jsonify, request, g
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
 from datetime import datetime
+from decimal import Decimal
+from functools import wraps
+import hashlib
+from werkzeug.exceptions import HTTPException
+import orjson
 from src.models.project import db
 from src.routes.projects import projects_bp
 from src.routes.ai_chat import ai_chat_bp
@@ -25,11 +31,46 @@ except ImportError as e:
     print(f"Enhanced features not available: {e}")
     ENHANCED_FEATURES_AVAILABLE = False
 
+# The personalization engine is optional on its own, so its failure leaves the other enhanced routes up
+try:
+    from src.personalization_engine import get_personalization_engine
+    PERSONALIZATION_AVAILABLE = True
+except ImportError as e:
+    print(f"Personalization engine not available: {e}")
+    PERSONALIZATION_AVAILABLE = False
+
+class ORJSONProvider(JSONProvider):
+    """JSON provider backed by orjson for faster response serialization"""
+
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_SORT_KEYS
+
+    @staticmethod
+    def _default(o):
+        if isinstance(o, Decimal):
+            return str(o)
+        if hasattr(o, '__html__'):
+            return str(o.__html__())
+        raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self._default, option=self.options).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config['SECRET_KEY'] = 'techcraft_genius_ai_enhanced_secret_key_2024'
+app.json = ORJSONProvider(app)
+# Match '/api/projects' and '/api/projects/' alike instead of answering the
+# mismatch with a 308 redirect; must be set before any rule is registered.
+app.url_map.strict_slashes = False
+app.url_map.merge_slashes = True
 
-# Enable CORS for all routes
-CORS(app)
+# Enable CORS for API routes only; the bundled frontend is same-origin, so
+# cross-origin callers must be listed in ALLOWED_ORIGINS (comma separated).
+# Preflight results are cached client-side for a day.
+ALLOWED_ORIGINS = [origin.strip() for origin in os.environ.get('ALLOWED_ORIGINS', '').split(',') if origin.strip()]
+CORS(app, resources={r'/api/*': {'origins': ALLOWED_ORIGINS}}, max_age=86400)
 
 # Register blueprints
 app.register_blueprint(projects_bp, url_prefix='/api')
@@ -49,12 +90,75 @@ db.init_app(app)
 with app.app_context():
     db.create_all()
 
+ENHANCED_UNAVAILABLE_ERROR = {'error': 'Enhanced features not available'}
+PERSONALIZATION_UNAVAILABLE_ERROR = {'error': 'Personalization engine not available'}
+NO_COMPONENTS_ERROR = {'error': 'No components specified'}
+MISSING_DEVICE_ACTION_ERROR = {'error': 'device_id and action are required'}
+NO_IMAGE_ERROR = {'error': 'No image data provided'}
+
+def require_enhanced(fn):
+    """Short-circuit a route with 503 when enhanced features failed to load"""
+    if ENHANCED_FEATURES_AVAILABLE:
+        return fn
+
+    @wraps(fn)
+    def unavailable(*args, **kwargs):
+        return jsonify(ENHANCED_UNAVAILABLE_ERROR), 503
+    return unavailable
+
+def require_personalization(fn):
+    """Short-circuit a route with 503 when the personalization engine failed to load"""
+    if PERSONALIZATION_AVAILABLE:
+        return fn
+
+    @wraps(fn)
+    def unavailable(*args, **kwargs):
+        return jsonify(PERSONALIZATION_UNAVAILABLE_ERROR), 503
+    return unavailable
+
+def request_timestamp() -> str:
+    """ISO timestamp computed once per request and shared by handlers"""
+    if 'ts' not in g:
+        g.ts = datetime.now().isoformat()
+    return g.ts
+
+def apply_cache_policy(response, max_age=None):
+    """Set Cache-Control for a response; household state is private and revalidated on every use"""
+    # Only public data may be served stale, and only when the route passes max_age
+    if max_age is None:
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+    else:
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+    return response
+
+def conditional_json(payload, etag_source=None, max_age=None):
+    """jsonify payload with an ETag so repeat pollers get 304 Not Modified"""
+    response = jsonify(payload)
+    if etag_source is None:
+        digest_input = response.get_data()
+    else:
+        digest_input = app.json.dumps(etag_source).encode()
+    # An ETag over only part of the body cannot promise byte-identical responses, so it is weak
+    response.set_etag(hashlib.blake2b(digest_input, digest_size=16).hexdigest(), weak=etag_source is not None)
+    apply_cache_policy(response, max_age)
+    return response.make_conditional(request)
+
+@app.errorhandler(Exception)
+def handle_unexpected_error(e):
+    """Turn uncaught route errors into the standard JSON error response"""
+    if isinstance(e, HTTPException):
+        return e
+    app.logger.exception("Unhandled error on %s %s", request.method, request.path)
+    return jsonify({'error': str(e)}), 500
+
 # Enhanced API endpoints
 @app.route('/api/system/status', methods=['GET'])
 def get_system_status():
     """Get comprehensive system status"""
     status = {
-        'timestamp': datetime.now().isoformat(),
+        'timestamp': request_timestamp(),
         'enhanced_features': ENHANCED_FEATURES_AVAILABLE,
         'version': '2.0.0-enhanced',
         'components': {
@@ -73,7 +177,7 @@ def get_system_status():
             status['components']['ai_manager'] = len(ai_status) > 0
             status['ai_providers'] = ai_status
         except Exception as e:
-            print(f"AI manager check failed: {e}")
+            app.logger.debug("AI manager check failed: %s", e)
         
         try:
             # Check IoT controller status
@@ -82,7 +186,7 @@ def get_system_status():
             status['iot_devices'] = device_status['total_devices']
             status['iot_online'] = device_status['online_devices']
         except Exception as e:
-            print(f"IoT controller check failed: {e}")
+            app.logger.debug("IoT controller check failed: %s", e)
         
         try:
             # Check weather service
@@ -90,7 +194,7 @@ def get_system_status():
             status['components']['weather_service'] = len(weather_data) > 0
             status['current_weather'] = weather_data
         except Exception as e:
-            print(f"Weather service check failed: {e}")
+            app.logger.debug("Weather service check failed: %s", e)
         
         status['components']['price_monitor'] = True
         status['components']['image_analyzer'] = True
@@ -98,163 +202,134 @@ def get_system_status():
     return jsonify(status)
 
 @app.route('/api/enhanced/price-check', methods=['POST'])
+@require_enhanced
 def enhanced_price_check():
     """Enhanced price checking with real-time data"""
-    if not ENHANCED_FEATURES_AVAILABLE:
-        return jsonify({'error': 'Enhanced features not available'}), 503
+    data = request.get_json()
+    components = data.get('components', [])
     
-    try:
-        data = request.get_json()
-        components = data.get('components', [])
-        
-        if not components:
-            return jsonify({'error': 'No components specified'}), 400
-        
-        # Monitor prices for specified components
-        price_data = price_monitor.monitor_component_prices(components)
-        
-        return jsonify({
-            'success': True,
-            'price_data': price_data,
-            'timestamp': datetime.now().isoformat()
-        })
+    if not components:
+        return jsonify(NO_COMPONENTS_ERROR), 400
     
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    # Monitor prices for specified components
+    price_data = price_monitor.monitor_component_prices(components)
+    
+    return jsonify({
+        'success': True,
+        'price_data': price_data,
+        'timestamp': request_timestamp()
+    })
 
 @app.route('/api/enhanced/iot/devices', methods=['GET'])
+@require_enhanced
 def get_iot_devices():
     """Get all IoT devices"""
-    if not ENHANCED_FEATURES_AVAILABLE:
-        return jsonify({'error': 'Enhanced features not available'}), 503
-    
-    try:
-        device_status = iot_controller.get_device_status()
-        return jsonify(device_status)
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    device_status = iot_controller.get_device_status()
+    return conditional_json(device_status)
 
 @app.route('/api/enhanced/iot/control', methods=['POST'])
+@require_enhanced
 def control_iot_device():
     """Control an IoT device"""
-    if not ENHANCED_FEATURES_AVAILABLE:
-        return jsonify({'error': 'Enhanced features not available'}), 503
+    data = request.get_json()
+    device_id = data.get('device_id')
+    action = data.get('action')
+    parameters = data.get('parameters', {})
     
-    try:
-        data = request.get_json()
-        device_id = data.get('device_id')
-        action = data.get('action')
-        parameters = data.get('parameters', {})
-        
-        if not device_id or not action:
-            return jsonify({'error': 'device_id and action are required'}), 400
-        
-        result = iot_controller.control_device(device_id, action, parameters)
-        return jsonify(result)
+    if not device_id or not action:
+        return jsonify(MISSING_DEVICE_ACTION_ERROR), 400
     
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    result = iot_controller.control_device(device_id, action, parameters)
+    return jsonify(result)
 
 @app.route('/api/enhanced/iot/automation', methods=['GET'])
+@require_enhanced
 def get_automation_rules():
     """Get all automation rules"""
-    if not ENHANCED_FEATURES_AVAILABLE:
-        return jsonify({'error': 'Enhanced features not available'}), 503
-    
-    try:
-        automation_status = iot_controller.get_automation_status()
-        return jsonify(automation_status)
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    automation_status = iot_controller.get_automation_status()
+    return jsonify(automation_status)
 
 @app.route('/api/enhanced/iot/energy-report', methods=['GET'])
+@require_enhanced
 def get_energy_report():
     """Get energy consumption report"""
-    if not ENHANCED_FEATURES_AVAILABLE:
-        return jsonify({'error': 'Enhanced features not available'}), 503
-    
-    try:
-        days = request.args.get('days', 7, type=int)
-        energy_report = iot_controller.get_energy_report(days)
-        return jsonify(energy_report)
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    days = request.args.get('days', 7, type=int)
+    energy_report = iot_controller.get_energy_report(days)
+    return conditional_json(energy_report)
+
+@app.route('/api/enhanced/personalization/dashboard', methods=['GET'])
+@require_personalization
+def get_personalization_dashboard():
+    """Get personalization dashboard data, answering unchanged polls with 304"""
+    engine = get_personalization_engine()
+    # The engine versions its aggregates, so an unchanged poll costs one comparison; the payload's
+    # _version doubles as the ETag and embeds the engine start time, so tokens from before a restart never match
+    etag = engine.dashboard_version
+    since_version = request.args.get('since_version')
+    if since_version == etag or request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(engine.get_dashboard_data(as_bytes=True), mimetype='application/json')
+    response.set_etag(etag)
+    return apply_cache_policy(response)
 
 @app.route('/api/enhanced/news', methods=['GET'])
+@require_enhanced
 def get_tech_news():
     """Get relevant tech news"""
-    if not ENHANCED_FEATURES_AVAILABLE:
-        return jsonify({'error': 'Enhanced features not available'}), 503
+    limit = request.args.get('limit', 10, type=int)
+    relevant_news = news_monitor.get_relevant_news(limit)
     
-    try:
-        limit = request.args.get('limit', 10, type=int)
-        relevant_news = news_monitor.get_relevant_news(limit)
-        
-        news_data = []
-        for news in relevant_news:
-            news_data.append({
-                'title': news.title,
-                'summary': news.summary,
-                'url': news.url,
-                'source': news.source,
-                'published_date': news.published_date.isoformat(),
-                'relevance_score': news.relevance_score
-            })
-        
-        return jsonify({
-            'news': news_data,
-            'total': len(news_data),
-            'timestamp': datetime.now().isoformat()
+    news_data = []
+    for news in relevant_news:
+        news_data.append({
+            'title': news.title,
+            'summary': news.summary,
+            'url': news.url,
+            'source': news.source,
+            'published_date': news.published_date,
+            'relevance_score': news.relevance_score
         })
     
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    return conditional_json({
+        'news': news_data,
+        'total': len(news_data),
+        'timestamp': request_timestamp()
+    }, etag_source=news_data, max_age=60)
 
 @app.route('/api/enhanced/data-collection', methods=['POST'])
+@require_enhanced
 def trigger_data_collection():
     """Manually trigger data collection"""
-    if not ENHANCED_FEATURES_AVAILABLE:
-        return jsonify({'error': 'Enhanced features not available'}), 503
+    # Run data collection in background
+    import threading
+    collection_thread = threading.Thread(target=run_daily_data_collection, daemon=True)
+    collection_thread.start()
     
-    try:
-        # Run data collection in background
-        import threading
-        collection_thread = threading.Thread(target=run_daily_data_collection, daemon=True)
-        collection_thread.start()
-        
-        return jsonify({
-            'success': True,
-            'message': 'Data collection started',
-            'timestamp': datetime.now().isoformat()
-        })
-    
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    return jsonify({
+        'success': True,
+        'message': 'Data collection started',
+        'timestamp': request_timestamp()
+    })
 
 @app.route('/api/enhanced/image-analysis', methods=['POST'])
+@require_enhanced
 def analyze_image():
     """Analyze uploaded image for automation opportunities"""
-    if not ENHANCED_FEATURES_AVAILABLE:
-        return jsonify({'error': 'Enhanced features not available'}), 503
+    data = request.get_json()
+    image_data = data.get('image')
     
-    try:
-        data = request.get_json()
-        image_data = data.get('image')
-        
-        if not image_data:
-            return jsonify({'error': 'No image data provided'}), 400
-        
-        from src.image_analyzer import analyze_uploaded_image
-        analysis_result = analyze_uploaded_image(image_data)
-        
-        return jsonify({
-            'success': True,
-            'analysis': analysis_result,
-            'timestamp': datetime.now().isoformat()
-        })
+    if not image_data:
+        return jsonify(NO_IMAGE_ERROR), 400
     
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    from src.image_analyzer import analyze_uploaded_image
+    analysis_result = analyze_uploaded_image(image_data)
+    
+    return jsonify({
+        'success': True,
+        'analysis': analysis_result,
+        'timestamp': request_timestamp()
+    })
 
 # Serve static files (frontend)
 @app.route('/', defaults={'path': ''})
@@ -3,19 +3,162 @@ Hyper-Personalization & Contextual Intelligence Engine
 Advanced personalization system for individual family members and contextual automation
 """
 
-import json
+import orjson
+import os
+import sys
 import time
 import logging
 import sqlite3
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Callable, Dict, List, Optional, Any, Tuple, Union
 from dataclasses import dataclass, asdict
 from enum import Enum
 import numpy as np
-from collections import defaultdict, deque
-import statistics
-import hashlib
+from collections import Counter, defaultdict
+import schedule
+import itertools
+
+try:
+    from src.sqlite_writer import QueuedWriter
+except ImportError:  # run as a script from inside src/
+    from sqlite_writer import QueuedWriter
+
+# TECHCRAFT_NUMBA=0 skips the numba import and JIT compile, which short-lived processes never earn back
+NUMBA_AVAILABLE = False
+if os.environ.get('TECHCRAFT_NUMBA', '1') == '1':
+    try:
+        from numba import njit
+        NUMBA_AVAILABLE = True
+    except ImportError:
+        pass
+
+logger = logging.getLogger(__name__)
+
+# 1970-01-01 was a Thursday; with Monday == 0 epoch day 0 maps to 3
+EPOCH_WEEKDAY = 3
+WEEKDAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+# JSON columns are encoded with orjson; non-string keys and numpy scalars are accepted like json.dumps would
+JSON_COLUMN_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+def _dumps(obj: Any) -> str:
+    """Encode a value for a TEXT JSON column"""
+    return orjson.dumps(obj, option=JSON_COLUMN_OPTIONS).decode()
+
+_loads = orjson.loads
+
+# Placeholder affected_members column for context log rows, encoded once
+NO_AFFECTED_MEMBERS = _dumps([])
+
+# In-memory interaction history kept per member, and the slice of it re-analyzed each cycle
+INTERACTION_HISTORY_LIMIT = 1000
+PROFILE_ANALYSIS_WINDOW = 100
+CONTEXT_HISTORY_SIZE = 10_000
+PROFILE_UPDATE_WORKERS = 8
+
+# Cached personalization scores also expire because their recency factor depends on the clock
+PERSONALIZATION_SCORE_TTL = 300  # seconds
+
+# Dashboard thresholds; learned_from values are interned so equality checks hit the identity fast path
+HIGH_PERSONALIZATION_SCORE = 0.8
+LEARNED_OBSERVED = sys.intern("observed")
+
+SQLITE_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA mmap_size=268435456',
+    'PRAGMA cache_size=-65536',
+)
+
+SAVE_MEMBER_SQL = '''
+    INSERT OR REPLACE INTO family_members 
+    (id, name, age, personality_type, preferences, schedule, health_data, learning_style,
+     skill_level, interests, accessibility_needs, privacy_level, automation_comfort, created_date, last_updated)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+SAVE_PREFERENCE_SQL = '''
+    INSERT OR REPLACE INTO personal_preferences 
+    (id, member_id, category, preference_data, confidence, context_dependent,
+     seasonal_variation, time_dependent, learned_from, priority, last_updated)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+# Writes reuse these exact strings so each connection's statement cache keeps them prepared
+LOG_INTERACTION_SQL = '''
+    INSERT INTO interaction_log 
+    (member_id, timestamp, interaction_type, device_id, action, context, satisfaction_score, notes)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+LOG_CONTEXT_SQL = '''
+    INSERT INTO context_log 
+    (timestamp, context_type, context_data, triggered_rules, affected_members)
+    VALUES (?, ?, ?, ?, ?)
+'''
+
+SAVE_RULE_SQL = '''
+    INSERT OR REPLACE INTO contextual_rules 
+    (id, name, context_type, conditions, actions, affected_members, priority, active, success_rate, created_date)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+SAVE_RECOMMENDATION_SQL = '''
+    INSERT OR REPLACE INTO personalized_recommendations 
+    (id, member_id, recommendation_type, title, description, benefits, implementation_steps,
+     estimated_cost, difficulty_level, time_to_implement, personalization_score, context_relevance, created_date)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+# Single-row writes are queued and committed by a background thread in batches
+WRITE_QUEUE_SIZE = 10000
+WRITE_BATCH_ROWS = 500
+WRITE_FLUSH_INTERVAL = 0.1  # seconds
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _device_stats_kernel(dev_ids, hours, sats, sat_mask, n_devices):
+        """Per-device usage counts, hour histograms, first-seen positions and satisfaction sums"""
+        n = len(dev_ids)
+        counts = np.zeros(n_devices, np.int64)
+        hour_counts = np.zeros((n_devices, 24), np.int64)
+        hour_first_seen = np.full((n_devices, 24), n, np.int64)
+        sat_sum = np.zeros(n_devices, np.float64)
+        sat_count = np.zeros(n_devices, np.int64)
+        for i in range(n):
+            d = dev_ids[i]
+            h = hours[i]
+            counts[d] += 1
+            hour_counts[d, h] += 1
+            if hour_first_seen[d, h] == n:
+                hour_first_seen[d, h] = i
+            if sat_mask[i]:
+                sat_sum[d] += sats[i]
+                sat_count[d] += 1
+        return counts, hour_counts, hour_first_seen, sat_sum, sat_count
+else:
+    def _device_stats_kernel(dev_ids, hours, sats, sat_mask, n_devices):
+        """Per-device usage counts, hour histograms, first-seen positions and satisfaction sums"""
+        n = len(dev_ids)
+        cells = dev_ids * 24 + hours
+        counts = np.bincount(dev_ids, minlength=n_devices)
+        hour_counts = np.bincount(cells, minlength=n_devices * 24).reshape(n_devices, 24)
+        hour_first_seen = np.full(n_devices * 24, n, np.int64)
+        np.minimum.at(hour_first_seen, cells, np.arange(n))
+        sat_sum = np.bincount(dev_ids[sat_mask], weights=sats[sat_mask], minlength=n_devices)
+        sat_count = np.bincount(dev_ids[sat_mask], minlength=n_devices)
+        return counts, hour_counts, hour_first_seen.reshape(n_devices, 24), sat_sum, sat_count
+
+def _warm_up_kernels():
+    """Compile the numba kernels for the dtypes the analyzers pass, before any request needs them"""
+    if NUMBA_AVAILABLE:
+        _device_stats_kernel(
+            np.zeros(1, dtype=np.int64), np.zeros(1, dtype=np.int64),
+            np.zeros(1, dtype=np.float64), np.zeros(1, dtype=np.bool_), 1
+        )
 
 class PersonalityType(Enum):
     TECH_ENTHUSIAST = "tech_enthusiast"
@@ -43,7 +186,13 @@ class PreferenceCategory(Enum):
     COMFORT = "comfort"
     PRODUCTIVITY = "productivity"
 
-@dataclass
+# (member, value) pairs resolved once for the dashboard's enum-ordered breakdowns
+PERSONALITY_TYPE_ITEMS = tuple((pt, pt.value) for pt in PersonalityType)
+CONTEXT_TYPE_ITEMS = tuple((ct, ct.value) for ct in ContextType)
+PREFERENCE_CATEGORY_ITEMS = tuple((cat, cat.value) for cat in PreferenceCategory)
+SKILL_LEVELS = ("beginner", "intermediate", "advanced")
+
+@dataclass(slots=True)
 class FamilyMember:
     id: str
     name: str
@@ -61,7 +210,7 @@ class FamilyMember:
     created_date: datetime
     last_updated: datetime
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PersonalPreference:
     id: str
     member_id: str
@@ -75,7 +224,7 @@ class PersonalPreference:
     priority: int  # 1-10
     last_updated: datetime
 
-@dataclass
+@dataclass(slots=True)
 class ContextualRule:
     id: str
     name: str
@@ -88,15 +237,15 @@ class ContextualRule:
     success_rate: float
     created_date: datetime
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PersonalizedRecommendation:
     id: str
     member_id: str
     recommendation_type: str
     title: str
     description: str
-    benefits: List[str]
-    implementation_steps: List[str]
+    benefits: Tuple[str, ...]
+    implementation_steps: Tuple[str, ...]
     estimated_cost: float
     difficulty_level: str
     time_to_implement: int  # hours
@@ -104,7 +253,7 @@ class PersonalizedRecommendation:
     context_relevance: float  # 0-1
     created_date: datetime
 
-@dataclass
+@dataclass(slots=True)
 class AdaptiveBehavior:
     id: str
     behavior_name: str
@@ -116,32 +265,442 @@ class AdaptiveBehavior:
     failure_count: int
     last_executed: datetime
 
+# Circadian lighting for tech enthusiasts
+TECH_ENTHUSIAST_LIGHTING = {
+    'recommendation_type': "lighting",
+    'title': "Advanced Circadian Rhythm Lighting System",
+    'description': "Implement a sophisticated lighting system that automatically adjusts color temperature and brightness throughout the day to optimize your circadian rhythm and productivity.",
+    'benefits': (
+        "Improved sleep quality and energy levels",
+        "Enhanced focus during work hours",
+        "Reduced eye strain from screens",
+        "Automatic adjustment based on weather and season",
+    ),
+    'implementation_steps': (
+        "Install Philips Hue or LIFX smart bulbs in main living areas",
+        "Add motion sensors for automatic activation",
+        "Configure circadian rhythm schedule in smart home app",
+        "Integrate with calendar for meeting-based lighting",
+        "Set up voice control for manual adjustments",
+    ),
+    'estimated_cost': 250.0,
+    'difficulty_level': "intermediate",
+    'time_to_implement': 4,
+    'personalization_score': 0.9,
+    'context_relevance': 0.8
+}
+
+# Ambient lighting for comfort seekers
+COMFORT_SEEKER_LIGHTING = {
+    'recommendation_type': "lighting",
+    'title': "Cozy Ambient Lighting Setup",
+    'description': "Create a warm, comfortable lighting environment that automatically adjusts to create the perfect ambiance for relaxation and comfort.",
+    'benefits': (
+        "Enhanced relaxation and comfort",
+        "Reduced stress from harsh lighting",
+        "Improved mood and well-being",
+        "Energy savings through smart scheduling",
+    ),
+    'implementation_steps': (
+        "Install warm white LED strips behind furniture",
+        "Add table lamps with smart dimmers",
+        "Configure sunset/sunrise simulation",
+        "Set up gentle wake-up lighting",
+        "Create preset scenes for different activities",
+    ),
+    'estimated_cost': 180.0,
+    'difficulty_level': "beginner",
+    'time_to_implement': 3,
+    'personalization_score': 0.85,
+    'context_relevance': 0.9
+}
+
+# Zone-based climate control for efficiency-focused members
+EFFICIENCY_FOCUSED_CLIMATE = {
+    'recommendation_type': "climate",
+    'title': "Precision Zone-Based Climate Control",
+    'description': "Implement a highly efficient zone-based heating and cooling system that optimizes comfort while minimizing energy waste.",
+    'benefits': (
+        "30% reduction in energy costs",
+        "Perfect temperature in each room",
+        "Automatic scheduling based on occupancy",
+        "Integration with weather forecasts",
+    ),
+    'implementation_steps': (
+        "Install smart thermostats in each zone",
+        "Add temperature and humidity sensors",
+        "Configure occupancy-based scheduling",
+        "Set up weather-responsive adjustments",
+        "Implement energy usage monitoring",
+    ),
+    'estimated_cost': 400.0,
+    'difficulty_level': "intermediate",
+    'time_to_implement': 6,
+    'personalization_score': 0.9,
+    'context_relevance': 0.85
+}
+
+# Local-only security for privacy-focused members
+PRIVACY_FOCUSED_SECURITY = {
+    'recommendation_type': "security",
+    'title': "Privacy-Focused Security System",
+    'description': "Implement a comprehensive security system that prioritizes privacy while maintaining excellent protection.",
+    'benefits': (
+        "Enhanced security without compromising privacy",
+        "Local processing of all video data",
+        "Encrypted communications",
+        "No cloud storage of personal data",
+    ),
+    'implementation_steps': (
+        "Install local NVR system for video storage",
+        "Add privacy-focused cameras with local processing",
+        "Configure encrypted communication protocols",
+        "Set up secure remote access via VPN",
+        "Implement facial recognition with local database",
+    ),
+    'estimated_cost': 600.0,
+    'difficulty_level': "advanced",
+    'time_to_implement': 8,
+    'personalization_score': 0.95,
+    'context_relevance': 0.9
+}
+
+# Renewable energy system for environmentalists
+ENVIRONMENTALIST_ENERGY = {
+    'recommendation_type': "energy",
+    'title': "Comprehensive Renewable Energy System",
+    'description': "Transform your home into a net-positive energy producer with solar panels, battery storage, and intelligent energy management.",
+    'benefits': (
+        "Eliminate electricity bills",
+        "Reduce carbon footprint by 80%",
+        "Energy independence and resilience",
+        "Potential income from excess energy sales",
+    ),
+    'implementation_steps': (
+        "Conduct professional energy audit",
+        "Install solar panel system on roof",
+        "Add battery storage system",
+        "Implement smart energy management system",
+        "Configure grid-tie and backup systems",
+    ),
+    'estimated_cost': 8000.0,
+    'difficulty_level': "advanced",
+    'time_to_implement': 40,
+    'personalization_score': 0.95,
+    'context_relevance': 0.85
+}
+
+# Workspace automation for members with a work environment preference
+REMOTE_WORKER_PRODUCTIVITY = {
+    'recommendation_type': "productivity",
+    'title': "AI-Powered Productivity Environment",
+    'description': "Create an intelligent workspace that automatically optimizes lighting, temperature, noise, and distractions based on your work patterns and calendar.",
+    'benefits': (
+        "25% increase in focus and productivity",
+        "Reduced fatigue and eye strain",
+        "Automatic distraction management",
+        "Seamless integration with work schedule",
+    ),
+    'implementation_steps': (
+        "Install smart lighting with focus modes",
+        "Add noise cancellation and white noise system",
+        "Configure calendar-based automation",
+        "Set up productivity tracking and analytics",
+        "Implement break reminders and movement prompts",
+    ),
+    'estimated_cost': 350.0,
+    'difficulty_level': "intermediate",
+    'time_to_implement': 5,
+    'personalization_score': 0.85,
+    'context_relevance': 0.9
+}
+
+# Health monitoring recommended to every member
+HOLISTIC_WELLNESS = {
+    'recommendation_type': "wellness",
+    'title': "Holistic Health Monitoring System",
+    'description': "Implement a comprehensive health monitoring system that tracks air quality, sleep patterns, activity levels, and stress indicators.",
+    'benefits': (
+        "Improved overall health and well-being",
+        "Early detection of health issues",
+        "Optimized sleep and recovery",
+        "Stress reduction through environmental control",
+    ),
+    'implementation_steps': (
+        "Install air quality monitoring sensors",
+        "Add sleep tracking and optimization system",
+        "Configure stress detection through biometrics",
+        "Set up activity and movement reminders",
+        "Implement health data integration and analysis",
+    ),
+    'estimated_cost': 450.0,
+    'difficulty_level': "intermediate",
+    'time_to_implement': 6,
+    'personalization_score': 0.8,
+    'context_relevance': 0.85
+}
+
+# Contextual actions that apply member preferences: action type -> (category, reported action_type)
+PREFERENCE_ACTIONS = {
+    'adjust_lighting': (PreferenceCategory.LIGHTING, 'lighting_adjustment'),
+    'adjust_temperature': (PreferenceCategory.TEMPERATURE, 'temperature_adjustment'),
+    'play_music': (PreferenceCategory.MUSIC, 'music_control'),
+}
+
+# Marks a context key that is missing when a compiled rule looks it up
+_UNSET = object()
+
+def _compile_conditions(conditions: Dict[str, Any]) -> Callable[[Dict[str, Any]], bool]:
+    """Generate a straight-line evaluator for one rule's conditions"""
+    # Keys and bounds live in the evaluator's namespace and are never spliced into the source
+    namespace = {'_UNSET': _UNSET}
+    clauses = []
+    for n, (key, value) in enumerate(conditions.items()):
+        namespace[f'key_{n}'] = key
+        clauses.append(f'(value_{n} := context.get(key_{n}, _UNSET)) is not _UNSET')
+        checks = value if isinstance(value, dict) else {'equals': value}
+        if 'min' in checks:
+            namespace[f'min_{n}'] = checks['min']
+            clauses.append(f'not value_{n} < min_{n}')
+        if 'max' in checks:
+            namespace[f'max_{n}'] = checks['max']
+            clauses.append(f'not value_{n} > max_{n}')
+        if 'equals' in checks:
+            namespace[f'equals_{n}'] = checks['equals']
+            clauses.append(f'not value_{n} != equals_{n}')
+    
+    source = 'def evaluate(context):\n    return ' + (' and '.join(clauses) or 'True') + '\n'
+    exec(compile(source, '<rule conditions>', 'exec'), namespace)
+    return namespace['evaluate']
+
+def _build_recommendation(template: Dict[str, Any], member: FamilyMember, rec_id: str,
+                          now: Optional[datetime] = None) -> PersonalizedRecommendation:
+    """Instantiate a shared recommendation template for one member"""
+    return PersonalizedRecommendation(id=rec_id, member_id=member.id, created_date=now or datetime.now(), **template)
+
+# Recommendation templates keyed by the member attribute that selects them
+LIGHTING_RECOMMENDATIONS = {
+    PersonalityType.TECH_ENTHUSIAST: TECH_ENTHUSIAST_LIGHTING,
+    PersonalityType.COMFORT_SEEKER: COMFORT_SEEKER_LIGHTING,
+}
+
+CLIMATE_RECOMMENDATIONS = {
+    PersonalityType.EFFICIENCY_FOCUSED: EFFICIENCY_FOCUSED_CLIMATE,
+}
+
+ENERGY_RECOMMENDATIONS = {
+    PersonalityType.ENVIRONMENTALIST: ENVIRONMENTALIST_ENERGY,
+}
+
+SECURITY_RECOMMENDATIONS = {
+    "high": PRIVACY_FOCUSED_SECURITY,
+}
+
+@dataclass(slots=True)
+class InteractionColumns:
+    """Column-oriented view of an interaction list, built once per analysis"""
+    records: List[Dict]
+    timestamps: np.ndarray  # datetime64[us]
+    epoch_seconds: np.ndarray  # int64 seconds since the epoch
+    hours: np.ndarray  # int64 hour of day, 0-23
+    device_ids: np.ndarray  # object, None when absent
+    actions: np.ndarray  # object, None when absent
+    contexts: np.ndarray  # object, 'unknown' when absent
+    satisfaction: np.ndarray  # float64, NaN when unscored
+    scored: np.ndarray  # bool, True where satisfaction is present
+    
+    @classmethod
+    def from_interactions(cls, interactions: List[Dict]) -> 'InteractionColumns':
+        """Extract every analyzed field from the interaction dicts in one pass per column"""
+        n = len(interactions)
+        return cls.from_arrays(
+            records=interactions,
+            timestamps=np.array([i['timestamp'] for i in interactions], dtype='datetime64[us]'),
+            device_ids=np.array([i.get('device_id') for i in interactions], dtype=object),
+            actions=np.array([i.get('action') for i in interactions], dtype=object),
+            contexts=np.array([i.get('context', 'unknown') for i in interactions], dtype=object),
+            satisfaction=np.fromiter(
+                (i.get('satisfaction_score') or np.nan for i in interactions), dtype=np.float64, count=n
+            )
+        )
+    
+    @classmethod
+    def from_arrays(cls, records: List[Dict], timestamps: np.ndarray, device_ids: np.ndarray,
+                    actions: np.ndarray, contexts: np.ndarray, satisfaction: np.ndarray) -> 'InteractionColumns':
+        """Build the view from ready-made columns, deriving the time and score helpers"""
+        epoch_seconds = timestamps.astype('datetime64[s]').astype(np.int64)
+        return cls(
+            records=records,
+            timestamps=timestamps,
+            epoch_seconds=epoch_seconds,
+            hours=(epoch_seconds // 3600) % 24,
+            device_ids=device_ids,
+            actions=actions,
+            contexts=contexts,
+            satisfaction=satisfaction,
+            scored=~np.isnan(satisfaction)
+        )
+    
+    def __len__(self) -> int:
+        return len(self.records)
+
+class InteractionBuffer:
+    """Fixed-size circular buffer of one member's interactions, stored column by column"""
+    __slots__ = ('records', 'timestamps', 'device_ids', 'actions', 'contexts', 'satisfaction', 'head', 'size')
+    
+    def __init__(self, capacity: int):
+        self.records: List[Optional[Dict]] = [None] * capacity
+        self.timestamps = np.zeros(capacity, dtype='datetime64[us]')
+        self.device_ids = np.empty(capacity, dtype=object)
+        self.actions = np.empty(capacity, dtype=object)
+        self.contexts = np.empty(capacity, dtype=object)
+        self.satisfaction = np.full(capacity, np.nan)
+        self.head = 0
+        self.size = 0
+    
+    def append(self, record: Dict[str, Any]):
+        """Store an interaction, overwriting the oldest one when full"""
+        i = self.head
+        self.records[i] = record
+        self.timestamps[i] = record['timestamp']
+        self.device_ids[i] = record.get('device_id')
+        self.actions[i] = record.get('action')
+        self.contexts[i] = record.get('context', 'unknown')
+        self.satisfaction[i] = record.get('satisfaction_score') or np.nan
+        self.head = (i + 1) % len(self.records)
+        self.size = min(self.size + 1, len(self.records))
+    
+    def _order(self, last: int) -> np.ndarray:
+        """Buffer positions of the newest `last` entries, oldest first"""
+        count = min(last, self.size)
+        start = (self.head - count) % len(self.records)
+        return (start + np.arange(count)) % len(self.records)
+    
+    def recent_columns(self, last: int) -> InteractionColumns:
+        """Column view of the newest `last` interactions, taken straight from the buffers"""
+        order = self._order(last)
+        return InteractionColumns.from_arrays(
+            records=[self.records[i] for i in order],
+            timestamps=self.timestamps[order],
+            device_ids=self.device_ids[order],
+            actions=self.actions[order],
+            contexts=self.contexts[order],
+            satisfaction=self.satisfaction[order]
+        )
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def __iter__(self):
+        return (self.records[i] for i in self._order(self.size))
+
+class ContextHistory:
+    """Fixed-size circular buffer of context changes with a parallel timestamp column"""
+    __slots__ = ('timestamps', 'payloads', 'head', 'size')
+    
+    def __init__(self, capacity: int):
+        self.timestamps = np.zeros(capacity, dtype='datetime64[us]')
+        self.payloads: List[Optional[Dict[str, Any]]] = [None] * capacity
+        self.head = 0
+        self.size = 0
+    
+    def push(self, timestamp: datetime, payload: Dict[str, Any]):
+        """Store a context change, overwriting the oldest one when full"""
+        self.timestamps[self.head] = timestamp
+        self.payloads[self.head] = payload
+        self.head = (self.head + 1) % len(self.payloads)
+        self.size = min(self.size + 1, len(self.payloads))
+    
+    def _order(self) -> np.ndarray:
+        """Buffer positions from oldest to newest"""
+        start = (self.head - self.size) % len(self.payloads)
+        return (start + np.arange(self.size)) % len(self.payloads)
+    
+    def since(self, cutoff: datetime) -> List[Dict[str, Any]]:
+        """Context changes recorded at or after cutoff, oldest first"""
+        order = self._order()
+        first = int(np.searchsorted(self.timestamps[order], np.datetime64(cutoff, 'us'), side='left'))
+        return [self.payloads[i] for i in order[first:]]
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def __iter__(self):
+        return (self.payloads[i] for i in self._order())
+
 class PersonalizationEngine:
     def __init__(self, db_path: str = "personalization_data.db"):
         self.db_path = db_path
         self.family_members: Dict[str, FamilyMember] = {}
         self.preferences: Dict[str, PersonalPreference] = {}
+        self._prefs_by_member: Dict[str, List[PersonalPreference]] = {}
+        self._pref_index: Dict[str, Dict[PreferenceCategory, PersonalPreference]] = {}
+        self._pref_lock = threading.RLock()  # serializes preference index updates across threads
+        # Bumped whenever a member's preferences change; invalidates the cached score
+        self._pref_version: Dict[str, int] = {}
+        self._score_cache: Dict[str, Tuple[int, float, float]] = {}  # member_id -> (version, computed_at, score)
+        self._saved_pref_rows: Dict[str, Tuple] = {}  # pref_id -> last persisted row without last_updated
         self.contextual_rules: Dict[str, ContextualRule] = {}
+        self._active_rules_by_context: Dict[ContextType, List[ContextualRule]] = {}  # highest priority first
+        self._compiled_conditions: Dict[str, Callable] = {}  # rule_id -> evaluator, rebuilt by update_contextual_rule
         self.recommendations: Dict[str, PersonalizedRecommendation] = {}
         self.adaptive_behaviors: Dict[str, AdaptiveBehavior] = {}
         
+        # Running dashboard aggregates, adjusted on every mutation so the dashboard never rescans
+        self._agg_lock = threading.Lock()
+        self._agg: Dict[str, Any] = {
+            "pt_counts": Counter(), "skill_counts": Counter(), "ac_sum": 0.0,
+            "pref_cat": Counter(), "pref_conf_sum": 0.0, "pref_observed": 0,
+            "ctx_type": Counter(), "ctx_active": 0, "ctx_success_sum": 0.0,
+            "rec_type": Counter(), "rec_high": 0,
+        }
+        # Bumped with every aggregate change; the formatted dashboard is reused until it moves
+        self._dash_version = 0
+        self._dash_snapshot: Optional[Tuple[int, Dict[str, Any]]] = None
+        self._dash_payload: Optional[Tuple[int, bytes]] = None  # serialized once per version
+        
+        # Ids are unique within a process via the counter and across restarts via the start time
+        self._id_base = int(time.time())
+        self._id_counter = itertools.count()
+        
         # Context tracking
         self.current_context = {}
-        self.context_history = deque(maxlen=1000)
+        self.context_history = ContextHistory(CONTEXT_HISTORY_SIZE)
         
         # Learning data
-        self.interaction_history = defaultdict(deque)
+        self.interaction_history = defaultdict(lambda: InteractionBuffer(INTERACTION_HISTORY_LIMIT))
+        self._writer = QueuedWriter(self.db_path, SQLITE_PRAGMAS, WRITE_QUEUE_SIZE,
+                                    WRITE_BATCH_ROWS, WRITE_FLUSH_INTERVAL)
         self.preference_learning_data = defaultdict(list)
         
         self.init_database()
         self.load_data()
-        self.initialize_sample_members()
+        if not self.family_members:
+            self.initialize_sample_members()
         self.start_personalization_engine()
     
+    def _next_id(self, prefix: str) -> str:
+        """Return a collision-free id; several may be issued within the same second"""
+        return f"{prefix}_{self._id_base}_{next(self._id_counter)}"
+    
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """The calling thread's connection, opened and tuned on first use"""
+        conn = getattr(self._tls, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path)
+            for pragma in SQLITE_PRAGMAS:
+                conn.execute(pragma)
+            self._tls.conn = conn
+        return conn
+    
     def init_database(self):
         """Initialize SQLite database for personalization data"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        # Each thread keeps its own long-lived connection; the lock serializes the bulk
+        # writers, while the queued writer waits out their locks with BEGIN IMMEDIATE.
+        self._db_lock = threading.Lock()
+        self._tls = threading.local()
+        cursor = self._conn.cursor()
         
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS family_members (
@@ -251,8 +810,10 @@ class PersonalizationEngine:
             )
         ''')
         
-        conn.commit()
-        conn.close()
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_pref_member ON personal_preferences(member_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_interaction_member_ts ON interaction_log(member_id, timestamp)')
+        
+        self._conn.commit()
     
     def initialize_sample_members(self):
         """Initialize sample family members"""
@@ -367,20 +928,130 @@ class PersonalizationEngine:
             )
         ]
         
+        preferences = []
         for member in sample_members:
-            self.family_members[member.id] = member
-            self.save_family_member(member)
+            self._store_member(member)
             
             # Generate initial preferences for each member
-            self.generate_initial_preferences(member)
+            preferences.extend(self._build_initial_preferences(member))
+        
+        for pref in preferences:
+            self._index_preference(pref)
+        
+        # Persist all members and preferences in a single transaction
+        with self._db_lock, self._conn:
+            self._bulk_save_members(self._conn, sample_members)
+            self._bulk_save_preferences(self._conn, preferences)
     
     def generate_initial_preferences(self, member: FamilyMember):
         """Generate initial preferences based on member profile"""
+        preferences = self._build_initial_preferences(member)
+        
+        for pref in preferences:
+            self._index_preference(pref)
+        
+        with self._db_lock, self._conn:
+            self._bulk_save_preferences(self._conn, preferences)
+    
+    def _index_preference(self, preference: PersonalPreference):
+        """Store a preference and keep the per-member index in step"""
+        with self._pref_lock:
+            previous = self.preferences.get(preference.id)
+            self.preferences[preference.id] = preference
+            self._bump_pref_version(preference.member_id)
+            if previous is not None:
+                self._track_preference(previous, -1)
+            self._track_preference(preference)
+            
+            if previous is not None:
+                previous_list = self._prefs_by_member[previous.member_id]
+                if previous.member_id == preference.member_id:
+                    previous_list[previous_list.index(previous)] = preference
+                    self._reindex_categories(preference.member_id)
+                    return
+                previous_list.remove(previous)
+                self._reindex_categories(previous.member_id)
+                self._bump_pref_version(previous.member_id)
+            
+            self._prefs_by_member.setdefault(preference.member_id, []).append(preference)
+            self._reindex_categories(preference.member_id)
+    
+    def _store_member(self, member: FamilyMember):
+        """Store a family member and keep the dashboard aggregates in step"""
+        previous = self.family_members.get(member.id)
+        self.family_members[member.id] = member
+        if previous is not None:
+            self._track_member(previous, -1)
+        self._track_member(member)
+    
+    def _track_member(self, member: FamilyMember, sign: int = 1):
+        """Add (sign=1) or remove (sign=-1) a member's share of the dashboard aggregates"""
+        agg = self._agg
+        with self._agg_lock:
+            self._dash_version += 1
+            agg["pt_counts"][member.personality_type] += sign
+            agg["skill_counts"][member.skill_level] += sign
+            agg["ac_sum"] += sign * member.automation_comfort
+    
+    def _track_preference(self, preference: PersonalPreference, sign: int = 1):
+        """Add (sign=1) or remove (sign=-1) a preference's share of the dashboard aggregates"""
+        agg = self._agg
+        with self._agg_lock:
+            self._dash_version += 1
+            agg["pref_cat"][preference.category] += sign
+            agg["pref_conf_sum"] += sign * preference.confidence
+            agg["pref_observed"] += sign * (preference.learned_from == LEARNED_OBSERVED)
+    
+    def _track_rule(self, rule: ContextualRule, sign: int = 1):
+        """Add (sign=1) or remove (sign=-1) a rule's share of the dashboard aggregates"""
+        agg = self._agg
+        with self._agg_lock:
+            self._dash_version += 1
+            agg["ctx_type"][rule.context_type] += sign
+            agg["ctx_active"] += sign * bool(rule.active)
+            agg["ctx_success_sum"] += sign * rule.success_rate
+    
+    def _track_recommendation(self, rec: PersonalizedRecommendation, sign: int = 1):
+        """Add (sign=1) or remove (sign=-1) a recommendation's share of the dashboard aggregates"""
+        agg = self._agg
+        with self._agg_lock:
+            self._dash_version += 1
+            agg["rec_type"][rec.recommendation_type] += sign
+            agg["rec_high"] += sign * (rec.personalization_score > HIGH_PERSONALIZATION_SCORE)
+    
+    def _adjust_agg(self, key: str, delta: float):
+        """Apply an in-place field change to a running dashboard aggregate"""
+        with self._agg_lock:
+            self._dash_version += 1
+            self._agg[key] += delta
+    
+    def _bump_pref_version(self, member_id: str):
+        """Mark a member's preferences as changed"""
+        self._pref_version[member_id] = self._pref_version.get(member_id, 0) + 1
+    
+    def _reindex_categories(self, member_id: str):
+        """Rebuild a member's category lookup; the earliest preference in each category wins"""
+        by_category = {}
+        for pref in self._prefs_by_member.get(member_id, ()):
+            by_category.setdefault(pref.category, pref)
+        self._pref_index[member_id] = by_category
+    
+    def _collect_prefs(self, category: PreferenceCategory, members: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Preference data in one category for each member that has it"""
+        settings = {}
+        for member_id in members:
+            pref = self._pref_index.get(member_id, {}).get(category)
+            if pref is not None:
+                settings[member_id] = pref.preference_data
+        return settings
+    
+    def _build_initial_preferences(self, member: FamilyMember) -> List[PersonalPreference]:
+        """Build the profile-based starter preferences for a member"""
         preferences = []
         
         # Lighting preferences
         lighting_pref = PersonalPreference(
-            id=f"pref_lighting_{member.id}_{int(time.time())}",
+            id=self._next_id(f"pref_lighting_{member.id}"),
             member_id=member.id,
             category=PreferenceCategory.LIGHTING,
             preference_data={
@@ -406,7 +1077,7 @@ class PersonalizationEngine:
         
         # Temperature preferences
         temp_pref = PersonalPreference(
-            id=f"pref_temp_{member.id}_{int(time.time())}",
+            id=self._next_id(f"pref_temp_{member.id}"),
             member_id=member.id,
             category=PreferenceCategory.TEMPERATURE,
             preference_data={
@@ -433,7 +1104,7 @@ class PersonalizationEngine:
         
         # Music preferences
         music_pref = PersonalPreference(
-            id=f"pref_music_{member.id}_{int(time.time())}",
+            id=self._next_id(f"pref_music_{member.id}"),
             member_id=member.id,
             category=PreferenceCategory.MUSIC,
             preference_data={
@@ -464,7 +1135,7 @@ class PersonalizationEngine:
         
         # Security preferences
         security_pref = PersonalPreference(
-            id=f"pref_security_{member.id}_{int(time.time())}",
+            id=self._next_id(f"pref_security_{member.id}"),
             member_id=member.id,
             category=PreferenceCategory.SECURITY,
             preference_data={
@@ -485,104 +1156,135 @@ class PersonalizationEngine:
         )
         preferences.append(security_pref)
         
-        # Save all preferences
-        for pref in preferences:
-            self.preferences[pref.id] = pref
-            self.save_preference(pref)
+        return preferences
     
-    def analyze_member_behavior(self, member_id: str, interaction_data: List[Dict]) -> Dict[str, Any]:
-        """Analyze member behavior patterns for personalization"""
+    def analyze_member_behavior(self, member_id: str,
+                                interaction_data: Union[List[Dict], InteractionColumns],
+                                now: Optional[datetime] = None,
+                                generate_recommendations: bool = True) -> Dict[str, Any]:
+        """Analyze member behavior patterns for personalization, optionally generating recommendations"""
         if member_id not in self.family_members:
             return {"error": "Member not found"}
         
         member = self.family_members[member_id]
         
+        # Extract the interaction fields once and share them across analyzers
+        if isinstance(interaction_data, InteractionColumns):
+            columns = interaction_data
+        else:
+            columns = InteractionColumns.from_interactions(interaction_data)
+        
         # Analyze interaction patterns
         patterns = {
-            "device_usage": self._analyze_device_usage_patterns(interaction_data),
-            "time_patterns": self._analyze_time_patterns(interaction_data),
-            "preference_evolution": self._analyze_preference_evolution(member_id, interaction_data),
-            "context_sensitivity": self._analyze_context_sensitivity(interaction_data),
-            "automation_acceptance": self._analyze_automation_acceptance(interaction_data)
+            "device_usage": self._analyze_device_usage_patterns(columns),
+            "time_patterns": self._analyze_time_patterns(columns),
+            "preference_evolution": self._analyze_preference_evolution(member_id, columns),
+            "context_sensitivity": self._analyze_context_sensitivity(columns),
+            "automation_acceptance": self._analyze_automation_acceptance(columns)
         }
         
         # Update member profile based on analysis
         self._update_member_profile(member, patterns)
         
         # Generate new personalized recommendations
-        recommendations = self.generate_personalized_recommendations(member_id, patterns)
+        recommendations = []
+        if generate_recommendations:
+            recommendations = self.generate_personalized_recommendations(member_id, patterns, now)
         
         return {
             "member_id": member_id,
             "analysis_date": datetime.now().isoformat(),
             "patterns": patterns,
-            "updated_preferences": len([p for p in self.preferences.values() if p.member_id == member_id]),
+            "updated_preferences": len(self._prefs_by_member.get(member_id, ())),
             "new_recommendations": len(recommendations),
-            "personalization_score": self._calculate_personalization_score(member_id)
+            "personalization_score": self._calculate_personalization_score(member_id, now)
         }
     
-    def _analyze_device_usage_patterns(self, interaction_data: List[Dict]) -> Dict[str, Any]:
+    def _analyze_device_usage_patterns(self, columns: InteractionColumns) -> Dict[str, Any]:
         """Analyze device usage patterns"""
-        device_usage = defaultdict(list)
+        rows = np.flatnonzero(columns.device_ids.astype(bool))
+        if not rows.size:
+            return {}
+        
+        device_keys, dev_ids = self._factorize(columns.device_ids[rows])
+        hours = columns.hours[rows]
+        sats = columns.satisfaction[rows]
+        sat_mask = columns.scored[rows]
+        
+        counts, hour_counts, hour_first_seen, sat_sum, sat_count = _device_stats_kernel(
+            dev_ids, hours, sats, sat_mask, len(device_keys)
+        )
         
-        for interaction in interaction_data:
-            if interaction.get('device_id'):
-                device_usage[interaction['device_id']].append(interaction)
+        # Stable grouping keeps each device's interactions in their original order
+        order = np.argsort(dev_ids, kind='stable')
+        group_ends = np.cumsum(counts)
         
         patterns = {}
-        for device_id, interactions in device_usage.items():
-            if len(interactions) < 5:
+        for d, device_id in enumerate(device_keys):
+            if counts[d] < 5:
                 continue
             
-            # Analyze usage frequency
-            usage_times = [i['timestamp'].hour for i in interactions]
-            peak_hours = self._find_peak_hours(usage_times)
-            
-            # Analyze satisfaction scores
-            satisfaction_scores = [i.get('satisfaction_score', 0.5) for i in interactions if i.get('satisfaction_score')]
-            avg_satisfaction = statistics.mean(satisfaction_scores) if satisfaction_scores else 0.5
+            interactions = [columns.records[k] for k in rows[order[group_ends[d] - counts[d]:group_ends[d]]]]
             
             patterns[device_id] = {
-                'usage_frequency': len(interactions),
-                'peak_hours': peak_hours,
-                'average_satisfaction': avg_satisfaction,
+                'usage_frequency': int(counts[d]),
+                'peak_hours': self._find_peak_hours(hour_counts[d], hour_first_seen[d]),
+                'average_satisfaction': float(sat_sum[d] / sat_count[d]) if sat_count[d] else 0.5,
                 'usage_trend': self._calculate_usage_trend(interactions),
                 'preferred_settings': self._extract_preferred_settings(interactions)
             }
         
         return patterns
     
-    def _analyze_time_patterns(self, interaction_data: List[Dict]) -> Dict[str, Any]:
+    def _analyze_time_patterns(self, columns: InteractionColumns) -> Dict[str, Any]:
         """Analyze time-based behavior patterns"""
-        hourly_activity = defaultdict(int)
-        daily_activity = defaultdict(int)
+        weekdays = (columns.epoch_seconds // 86400 + EPOCH_WEEKDAY) % 7
         
-        for interaction in interaction_data:
-            timestamp = interaction['timestamp']
-            hourly_activity[timestamp.hour] += 1
-            daily_activity[timestamp.strftime('%A')] += 1
+        hour_order, hour_counts = self._histogram_by_first_seen(columns.hours, 24)
+        day_order, day_counts = self._histogram_by_first_seen(weekdays, 7)
+        
+        # Stable sorts keep first-seen order among ties
+        busiest_hours = hour_order[np.argsort(-hour_counts[hour_order], kind='stable')]
+        quietest_hours = hour_order[np.argsort(hour_counts[hour_order], kind='stable')]
+        busiest_days = day_order[np.argsort(-day_counts[day_order], kind='stable')]
         
         return {
-            'most_active_hours': sorted(hourly_activity.keys(), key=lambda h: hourly_activity[h], reverse=True)[:3],
-            'least_active_hours': sorted(hourly_activity.keys(), key=lambda h: hourly_activity[h])[:3],
-            'most_active_days': sorted(daily_activity.keys(), key=lambda d: daily_activity[d], reverse=True)[:3],
-            'activity_distribution': dict(hourly_activity),
-            'weekly_pattern': dict(daily_activity)
+            'most_active_hours': busiest_hours[:3].tolist(),
+            'least_active_hours': quietest_hours[:3].tolist(),
+            'most_active_days': [WEEKDAY_NAMES[d] for d in busiest_days[:3]],
+            'activity_distribution': dict(zip(hour_order.tolist(), hour_counts[hour_order].tolist())),
+            'weekly_pattern': {WEEKDAY_NAMES[d]: count for d, count in zip(day_order, day_counts[day_order].tolist())}
         }
     
-    def _analyze_preference_evolution(self, member_id: str, interaction_data: List[Dict]) -> Dict[str, Any]:
+    @staticmethod
+    def _factorize(values: np.ndarray) -> Tuple[List[Any], np.ndarray]:
+        """Map hashable values to dense integer codes, returning the keys in first-seen order"""
+        index = {}
+        codes = np.fromiter(
+            (index.setdefault(value, len(index)) for value in values), dtype=np.int64, count=len(values)
+        )
+        return list(index), codes
+    
+    @staticmethod
+    def _histogram_by_first_seen(codes: np.ndarray, size: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Count small integer codes, returning present codes in first-seen order and the counts"""
+        counts = np.bincount(codes, minlength=size)
+        present, first_index = np.unique(codes, return_index=True)
+        return present[np.argsort(first_index)], counts
+    
+    def _analyze_preference_evolution(self, member_id: str, columns: InteractionColumns) -> Dict[str, Any]:
         """Analyze how preferences have evolved over time"""
-        member_preferences = [p for p in self.preferences.values() if p.member_id == member_id]
+        member_preferences = self._prefs_by_member.get(member_id, ())
         
         evolution = {}
         for pref in member_preferences:
             category = pref.category.value
             
             # Analyze confidence changes
-            confidence_trend = self._calculate_confidence_trend(pref, interaction_data)
+            confidence_trend = self._calculate_confidence_trend(pref, columns)
             
             # Analyze preference stability
-            stability_score = self._calculate_preference_stability(pref, interaction_data)
+            stability_score = self._calculate_preference_stability(pref, columns)
             
             evolution[category] = {
                 'confidence_trend': confidence_trend,
@@ -593,318 +1295,136 @@ class PersonalizationEngine:
         
         return evolution
     
-    def _analyze_context_sensitivity(self, interaction_data: List[Dict]) -> Dict[str, Any]:
+    def _analyze_context_sensitivity(self, columns: InteractionColumns) -> Dict[str, Any]:
         """Analyze sensitivity to different contexts"""
-        context_interactions = defaultdict(list)
+        contexts, codes = self._factorize(columns.contexts)
+        scored = columns.scored
         
-        for interaction in interaction_data:
-            context = interaction.get('context', 'unknown')
-            context_interactions[context].append(interaction)
+        counts = np.bincount(codes, minlength=len(contexts))
+        score_sums = np.bincount(codes[scored], weights=columns.satisfaction[scored], minlength=len(contexts))
+        score_counts = np.bincount(codes[scored], minlength=len(contexts))
         
         sensitivity = {}
-        for context, interactions in context_interactions.items():
-            if len(interactions) < 3:
+        for c, context in enumerate(contexts):
+            if counts[c] < 3:
                 continue
             
-            satisfaction_scores = [i.get('satisfaction_score', 0.5) for i in interactions if i.get('satisfaction_score')]
-            avg_satisfaction = statistics.mean(satisfaction_scores) if satisfaction_scores else 0.5
+            avg_satisfaction = float(score_sums[c] / score_counts[c]) if score_counts[c] else 0.5
             
             sensitivity[context] = {
-                'interaction_count': len(interactions),
+                'interaction_count': int(counts[c]),
                 'average_satisfaction': avg_satisfaction,
-                'context_importance': avg_satisfaction * len(interactions) / len(interaction_data)
+                'context_importance': avg_satisfaction * int(counts[c]) / len(columns)
             }
         
         return sensitivity
     
-    def _analyze_automation_acceptance(self, interaction_data: List[Dict]) -> Dict[str, Any]:
+    def _analyze_automation_acceptance(self, columns: InteractionColumns) -> Dict[str, Any]:
         """Analyze acceptance of automated actions"""
-        automated_interactions = [i for i in interaction_data if i.get('action') == 'automated']
-        manual_interactions = [i for i in interaction_data if i.get('action') == 'manual']
-        
-        auto_satisfaction = []
-        manual_satisfaction = []
+        automated = columns.actions == 'automated'
+        manual = columns.actions == 'manual'
+        scored = columns.scored
         
-        for interaction in automated_interactions:
-            if interaction.get('satisfaction_score'):
-                auto_satisfaction.append(interaction['satisfaction_score'])
+        auto_satisfaction = columns.satisfaction[automated & scored]
+        manual_satisfaction = columns.satisfaction[manual & scored]
         
-        for interaction in manual_interactions:
-            if interaction.get('satisfaction_score'):
-                manual_satisfaction.append(interaction['satisfaction_score'])
+        auto_mean = float(auto_satisfaction.mean()) if auto_satisfaction.size else None
+        manual_mean = float(manual_satisfaction.mean()) if manual_satisfaction.size else None
         
         return {
-            'automation_ratio': len(automated_interactions) / len(interaction_data) if interaction_data else 0,
-            'automation_satisfaction': statistics.mean(auto_satisfaction) if auto_satisfaction else 0.5,
-            'manual_satisfaction': statistics.mean(manual_satisfaction) if manual_satisfaction else 0.5,
-            'automation_preference': statistics.mean(auto_satisfaction) > statistics.mean(manual_satisfaction) if auto_satisfaction and manual_satisfaction else False
+            'automation_ratio': int(np.count_nonzero(automated)) / len(columns) if len(columns) else 0,
+            'automation_satisfaction': auto_mean if auto_mean is not None else 0.5,
+            'manual_satisfaction': manual_mean if manual_mean is not None else 0.5,
+            'automation_preference': auto_mean > manual_mean if auto_mean is not None and manual_mean is not None else False
         }
     
-    def generate_personalized_recommendations(self, member_id: str, behavior_patterns: Dict[str, Any] = None) -> List[PersonalizedRecommendation]:
+    def generate_personalized_recommendations(self, member_id: str, behavior_patterns: Dict[str, Any] = None,
+                                              now: Optional[datetime] = None) -> List[PersonalizedRecommendation]:
         """Generate personalized recommendations for a family member"""
         if member_id not in self.family_members:
             return []
         
         member = self.family_members[member_id]
         recommendations = []
+        # One timestamp for the whole batch; callers looping over members may pass their own
+        now = now or datetime.now()
         
         # Smart lighting recommendations
-        lighting_rec = self._generate_lighting_recommendation(member, behavior_patterns)
+        lighting_rec = self._generate_lighting_recommendation(member, behavior_patterns, now)
         if lighting_rec:
             recommendations.append(lighting_rec)
         
         # Climate control recommendations
-        climate_rec = self._generate_climate_recommendation(member, behavior_patterns)
+        climate_rec = self._generate_climate_recommendation(member, behavior_patterns, now)
         if climate_rec:
             recommendations.append(climate_rec)
         
         # Security recommendations
-        security_rec = self._generate_security_recommendation(member, behavior_patterns)
+        security_rec = self._generate_security_recommendation(member, behavior_patterns, now)
         if security_rec:
             recommendations.append(security_rec)
         
         # Energy efficiency recommendations
-        energy_rec = self._generate_energy_recommendation(member, behavior_patterns)
+        energy_rec = self._generate_energy_recommendation(member, behavior_patterns, now)
         if energy_rec:
             recommendations.append(energy_rec)
         
         # Productivity recommendations
-        productivity_rec = self._generate_productivity_recommendation(member, behavior_patterns)
+        productivity_rec = self._generate_productivity_recommendation(member, behavior_patterns, now)
         if productivity_rec:
             recommendations.append(productivity_rec)
         
         # Health and wellness recommendations
-        wellness_rec = self._generate_wellness_recommendation(member, behavior_patterns)
+        wellness_rec = self._generate_wellness_recommendation(member, behavior_patterns, now)
         if wellness_rec:
             recommendations.append(wellness_rec)
         
         # Save recommendations
         for rec in recommendations:
+            previous = self.recommendations.get(rec.id)
             self.recommendations[rec.id] = rec
+            if previous is not None:
+                self._track_recommendation(previous, -1)
+            self._track_recommendation(rec)
             self.save_recommendation(rec)
         
         return recommendations
     
-    def _generate_lighting_recommendation(self, member: FamilyMember, patterns: Dict[str, Any] = None) -> Optional[PersonalizedRecommendation]:
+    def _generate_lighting_recommendation(self, member: FamilyMember, patterns: Dict[str, Any] = None, now: Optional[datetime] = None) -> Optional[PersonalizedRecommendation]:
         """Generate personalized lighting recommendation"""
-        if member.personality_type == PersonalityType.TECH_ENTHUSIAST:
-            return PersonalizedRecommendation(
-                id=f"rec_lighting_{member.id}_{int(time.time())}",
-                member_id=member.id,
-                recommendation_type="lighting",
-                title="Advanced Circadian Rhythm Lighting System",
-                description="Implement a sophisticated lighting system that automatically adjusts color temperature and brightness throughout the day to optimize your circadian rhythm and productivity.",
-                benefits=[
-                    "Improved sleep quality and energy levels",
-                    "Enhanced focus during work hours",
-                    "Reduced eye strain from screens",
-                    "Automatic adjustment based on weather and season"
-                ],
-                implementation_steps=[
-                    "Install Philips Hue or LIFX smart bulbs in main living areas",
-                    "Add motion sensors for automatic activation",
-                    "Configure circadian rhythm schedule in smart home app",
-                    "Integrate with calendar for meeting-based lighting",
-                    "Set up voice control for manual adjustments"
-                ],
-                estimated_cost=250.0,
-                difficulty_level="intermediate",
-                time_to_implement=4,
-                personalization_score=0.9,
-                context_relevance=0.8,
-                created_date=datetime.now()
-            )
-        elif member.personality_type == PersonalityType.COMFORT_SEEKER:
-            return PersonalizedRecommendation(
-                id=f"rec_lighting_{member.id}_{int(time.time())}",
-                member_id=member.id,
-                recommendation_type="lighting",
-                title="Cozy Ambient Lighting Setup",
-                description="Create a warm, comfortable lighting environment that automatically adjusts to create the perfect ambiance for relaxation and comfort.",
-                benefits=[
-                    "Enhanced relaxation and comfort",
-                    "Reduced stress from harsh lighting",
-                    "Improved mood and well-being",
-                    "Energy savings through smart scheduling"
-                ],
-                implementation_steps=[
-                    "Install warm white LED strips behind furniture",
-                    "Add table lamps with smart dimmers",
-                    "Configure sunset/sunrise simulation",
-                    "Set up gentle wake-up lighting",
-                    "Create preset scenes for different activities"
-                ],
-                estimated_cost=180.0,
-                difficulty_level="beginner",
-                time_to_implement=3,
-                personalization_score=0.85,
-                context_relevance=0.9,
-                created_date=datetime.now()
-            )
-        
-        return None
+        template = LIGHTING_RECOMMENDATIONS.get(member.personality_type)
+        return _build_recommendation(template, member, self._next_id(f"rec_lighting_{member.id}"), now) if template else None
     
-    def _generate_climate_recommendation(self, member: FamilyMember, patterns: Dict[str, Any] = None) -> Optional[PersonalizedRecommendation]:
+    def _generate_climate_recommendation(self, member: FamilyMember, patterns: Dict[str, Any] = None, now: Optional[datetime] = None) -> Optional[PersonalizedRecommendation]:
         """Generate personalized climate control recommendation"""
-        if member.personality_type == PersonalityType.EFFICIENCY_FOCUSED:
-            return PersonalizedRecommendation(
-                id=f"rec_climate_{member.id}_{int(time.time())}",
-                member_id=member.id,
-                recommendation_type="climate",
-                title="Precision Zone-Based Climate Control",
-                description="Implement a highly efficient zone-based heating and cooling system that optimizes comfort while minimizing energy waste.",
-                benefits=[
-                    "30% reduction in energy costs",
-                    "Perfect temperature in each room",
-                    "Automatic scheduling based on occupancy",
-                    "Integration with weather forecasts"
-                ],
-                implementation_steps=[
-                    "Install smart thermostats in each zone",
-                    "Add temperature and humidity sensors",
-                    "Configure occupancy-based scheduling",
-                    "Set up weather-responsive adjustments",
-                    "Implement energy usage monitoring"
-                ],
-                estimated_cost=400.0,
-                difficulty_level="intermediate",
-                time_to_implement=6,
-                personalization_score=0.9,
-                context_relevance=0.85,
-                created_date=datetime.now()
-            )
-        
-        return None
+        template = CLIMATE_RECOMMENDATIONS.get(member.personality_type)
+        return _build_recommendation(template, member, self._next_id(f"rec_climate_{member.id}"), now) if template else None
     
-    def _generate_security_recommendation(self, member: FamilyMember, patterns: Dict[str, Any] = None) -> Optional[PersonalizedRecommendation]:
+    def _generate_security_recommendation(self, member: FamilyMember, patterns: Dict[str, Any] = None, now: Optional[datetime] = None) -> Optional[PersonalizedRecommendation]:
         """Generate personalized security recommendation"""
-        if member.privacy_level == "high":
-            return PersonalizedRecommendation(
-                id=f"rec_security_{member.id}_{int(time.time())}",
-                member_id=member.id,
-                recommendation_type="security",
-                title="Privacy-Focused Security System",
-                description="Implement a comprehensive security system that prioritizes privacy while maintaining excellent protection.",
-                benefits=[
-                    "Enhanced security without compromising privacy",
-                    "Local processing of all video data",
-                    "Encrypted communications",
-                    "No cloud storage of personal data"
-                ],
-                implementation_steps=[
-                    "Install local NVR system for video storage",
-                    "Add privacy-focused cameras with local processing",
-                    "Configure encrypted communication protocols",
-                    "Set up secure remote access via VPN",
-                    "Implement facial recognition with local database"
-                ],
-                estimated_cost=600.0,
-                difficulty_level="advanced",
-                time_to_implement=8,
-                personalization_score=0.95,
-                context_relevance=0.9,
-                created_date=datetime.now()
-            )
-        
-        return None
+        template = SECURITY_RECOMMENDATIONS.get(member.privacy_level)
+        return _build_recommendation(template, member, self._next_id(f"rec_security_{member.id}"), now) if template else None
     
-    def _generate_energy_recommendation(self, member: FamilyMember, patterns: Dict[str, Any] = None) -> Optional[PersonalizedRecommendation]:
+    def _generate_energy_recommendation(self, member: FamilyMember, patterns: Dict[str, Any] = None, now: Optional[datetime] = None) -> Optional[PersonalizedRecommendation]:
         """Generate personalized energy efficiency recommendation"""
-        if member.personality_type == PersonalityType.ENVIRONMENTALIST:
-            return PersonalizedRecommendation(
-                id=f"rec_energy_{member.id}_{int(time.time())}",
-                member_id=member.id,
-                recommendation_type="energy",
-                title="Comprehensive Renewable Energy System",
-                description="Transform your home into a net-positive energy producer with solar panels, battery storage, and intelligent energy management.",
-                benefits=[
-                    "Eliminate electricity bills",
-                    "Reduce carbon footprint by 80%",
-                    "Energy independence and resilience",
-                    "Potential income from excess energy sales"
-                ],
-                implementation_steps=[
-                    "Conduct professional energy audit",
-                    "Install solar panel system on roof",
-                    "Add battery storage system",
-                    "Implement smart energy management system",
-                    "Configure grid-tie and backup systems"
-                ],
-                estimated_cost=8000.0,
-                difficulty_level="advanced",
-                time_to_implement=40,
-                personalization_score=0.95,
-                context_relevance=0.85,
-                created_date=datetime.now()
-            )
-        
-        return None
+        template = ENERGY_RECOMMENDATIONS.get(member.personality_type)
+        return _build_recommendation(template, member, self._next_id(f"rec_energy_{member.id}"), now) if template else None
     
-    def _generate_productivity_recommendation(self, member: FamilyMember, patterns: Dict[str, Any] = None) -> Optional[PersonalizedRecommendation]:
+    def _generate_productivity_recommendation(self, member: FamilyMember, patterns: Dict[str, Any] = None, now: Optional[datetime] = None) -> Optional[PersonalizedRecommendation]:
         """Generate personalized productivity recommendation"""
         if "work_environment" in member.preferences:
-            return PersonalizedRecommendation(
-                id=f"rec_productivity_{member.id}_{int(time.time())}",
-                member_id=member.id,
-                recommendation_type="productivity",
-                title="AI-Powered Productivity Environment",
-                description="Create an intelligent workspace that automatically optimizes lighting, temperature, noise, and distractions based on your work patterns and calendar.",
-                benefits=[
-                    "25% increase in focus and productivity",
-                    "Reduced fatigue and eye strain",
-                    "Automatic distraction management",
-                    "Seamless integration with work schedule"
-                ],
-                implementation_steps=[
-                    "Install smart lighting with focus modes",
-                    "Add noise cancellation and white noise system",
-                    "Configure calendar-based automation",
-                    "Set up productivity tracking and analytics",
-                    "Implement break reminders and movement prompts"
-                ],
-                estimated_cost=350.0,
-                difficulty_level="intermediate",
-                time_to_implement=5,
-                personalization_score=0.85,
-                context_relevance=0.9,
-                created_date=datetime.now()
-            )
+            return _build_recommendation(REMOTE_WORKER_PRODUCTIVITY, member, self._next_id(f"rec_productivity_{member.id}"), now)
         
         return None
     
-    def _generate_wellness_recommendation(self, member: FamilyMember, patterns: Dict[str, Any] = None) -> Optional[PersonalizedRecommendation]:
+    def _generate_wellness_recommendation(self, member: FamilyMember, patterns: Dict[str, Any] = None, now: Optional[datetime] = None) -> Optional[PersonalizedRecommendation]:
         """Generate personalized health and wellness recommendation"""
-        return PersonalizedRecommendation(
-            id=f"rec_wellness_{member.id}_{int(time.time())}",
-            member_id=member.id,
-            recommendation_type="wellness",
-            title="Holistic Health Monitoring System",
-            description="Implement a comprehensive health monitoring system that tracks air quality, sleep patterns, activity levels, and stress indicators.",
-            benefits=[
-                "Improved overall health and well-being",
-                "Early detection of health issues",
-                "Optimized sleep and recovery",
-                "Stress reduction through environmental control"
-            ],
-            implementation_steps=[
-                "Install air quality monitoring sensors",
-                "Add sleep tracking and optimization system",
-                "Configure stress detection through biometrics",
-                "Set up activity and movement reminders",
-                "Implement health data integration and analysis"
-            ],
-            estimated_cost=450.0,
-            difficulty_level="intermediate",
-            time_to_implement=6,
-            personalization_score=0.8,
-            context_relevance=0.85,
-            created_date=datetime.now()
-        )
+        return _build_recommendation(HOLISTIC_WELLNESS, member, self._next_id(f"rec_wellness_{member.id}"), now)
     
     def create_contextual_automation(self, context_type: ContextType, conditions: Dict[str, Any], 
                                    actions: List[Dict[str, Any]], affected_members: List[str]) -> ContextualRule:
         """Create contextual automation rules"""
-        rule_id = f"rule_{context_type.value}_{int(time.time())}"
+        rule_id = self._next_id(f"rule_{context_type.value}")
         
         rule = ContextualRule(
             id=rule_id,
@@ -920,29 +1440,65 @@ class PersonalizationEngine:
         )
         
         self.contextual_rules[rule_id] = rule
+        self._track_rule(rule)
+        self._reindex_rules()
         self.save_contextual_rule(rule)
         
         return rule
     
+    def update_contextual_rule(self, rule_id: str, **changes) -> Optional[ContextualRule]:
+        """Apply field changes to a contextual rule, recompiling its conditions when they change"""
+        rule = self.contextual_rules.get(rule_id)
+        if rule is None:
+            return None
+        
+        self._track_rule(rule, sign=-1)
+        for field_name, value in changes.items():
+            setattr(rule, field_name, value)
+        self._track_rule(rule)
+        
+        if 'conditions' in changes:
+            # Rules must be edited through here; the evaluator is not rebuilt on in-place edits
+            self._compiled_conditions.pop(rule_id, None)
+        self._reindex_rules()
+        self.save_contextual_rule(rule)
+        
+        return rule
+    
+    def _reindex_rules(self):
+        """Rebuild the per-context lists of active rules, sorted by descending priority"""
+        by_context: Dict[ContextType, List[ContextualRule]] = {}
+        compiled = self._compiled_conditions
+        for rule in self.contextual_rules.values():
+            if rule.active:
+                by_context.setdefault(rule.context_type, []).append(rule)
+                # Every indexed rule gets an evaluator here, so evaluation is a plain lookup
+                if rule.id not in compiled:
+                    compiled[rule.id] = _compile_conditions(rule.conditions)
+        
+        for rules in by_context.values():
+            rules.sort(key=lambda r: r.priority, reverse=True)
+        
+        self._active_rules_by_context = by_context
+    
+    def recent_context(self, window_seconds: float) -> List[Dict[str, Any]]:
+        """Context changes from the last window_seconds, oldest first"""
+        return self.context_history.since(datetime.now() - timedelta(seconds=window_seconds))
+    
     def process_context_change(self, context_type: ContextType, context_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Process context changes and trigger appropriate automations"""
         self.current_context[context_type.value] = context_data
-        self.context_history.append({
-            'timestamp': datetime.now(),
+        timestamp = datetime.now()
+        self.context_history.push(timestamp, {
+            'timestamp': timestamp,
             'context_type': context_type,
             'context_data': context_data
         })
         
         triggered_actions = []
         
-        # Find applicable rules
-        applicable_rules = [
-            rule for rule in self.contextual_rules.values()
-            if rule.context_type == context_type and rule.active
-        ]
-        
-        # Sort by priority
-        applicable_rules.sort(key=lambda r: r.priority, reverse=True)
+        # Applicable rules are kept indexed by context and already sorted by priority
+        applicable_rules = self._active_rules_by_context.get(context_type, ())
         
         for rule in applicable_rules:
             if self._evaluate_rule_conditions(rule, context_data):
@@ -953,7 +1509,9 @@ class PersonalizationEngine:
                         triggered_actions.append(executed_action)
                 
                 # Update rule success rate
-                rule.success_rate = (rule.success_rate * 0.9) + (1.0 * 0.1)  # Simple moving average
+                success_rate = (rule.success_rate * 0.9) + (1.0 * 0.1)  # Simple moving average
+                self._adjust_agg("ctx_success_sum", success_rate - rule.success_rate)
+                rule.success_rate = success_rate
         
         # Log context change
         self.log_context_change(context_type, context_data, [r.id for r in applicable_rules])
@@ -962,101 +1520,31 @@ class PersonalizationEngine:
     
     def _evaluate_rule_conditions(self, rule: ContextualRule, context_data: Dict[str, Any]) -> bool:
         """Evaluate if rule conditions are met"""
-        for condition_key, condition_value in rule.conditions.items():
-            if condition_key not in context_data:
-                return False
-            
-            actual_value = context_data[condition_key]
-            
-            # Handle different condition types
-            if isinstance(condition_value, dict):
-                if 'min' in condition_value and actual_value < condition_value['min']:
-                    return False
-                if 'max' in condition_value and actual_value > condition_value['max']:
-                    return False
-                if 'equals' in condition_value and actual_value != condition_value['equals']:
-                    return False
-            else:
-                if actual_value != condition_value:
-                    return False
-        
-        return True
+        # Compiled by _reindex_rules for every active rule
+        return self._compiled_conditions[rule.id](context_data)
     
     def _execute_contextual_action(self, action: Dict[str, Any], affected_members: List[str]) -> Optional[Dict[str, Any]]:
         """Execute a contextual action"""
         action_type = action.get('type')
         
-        if action_type == 'adjust_lighting':
-            return self._execute_lighting_action(action, affected_members)
-        elif action_type == 'adjust_temperature':
-            return self._execute_temperature_action(action, affected_members)
-        elif action_type == 'play_music':
-            return self._execute_music_action(action, affected_members)
-        elif action_type == 'send_notification':
+        preference_action = PREFERENCE_ACTIONS.get(action_type)
+        if preference_action is not None:
+            category, result_type = preference_action
+            return self._execute_preference_action(category, result_type, affected_members)
+        if action_type == 'send_notification':
             return self._execute_notification_action(action, affected_members)
-        elif action_type == 'activate_security':
+        if action_type == 'activate_security':
             return self._execute_security_action(action, affected_members)
         
         return None
     
-    def _execute_lighting_action(self, action: Dict[str, Any], affected_members: List[str]) -> Dict[str, Any]:
-        """Execute lighting adjustment action"""
-        # Get personalized lighting preferences for affected members
-        lighting_settings = {}
-        
-        for member_id in affected_members:
-            member_prefs = [p for p in self.preferences.values() 
-                          if p.member_id == member_id and p.category == PreferenceCategory.LIGHTING]
-            
-            if member_prefs:
-                pref = member_prefs[0]
-                lighting_settings[member_id] = pref.preference_data
-        
-        # Apply lighting changes (simplified simulation)
-        return {
-            'action_type': 'lighting_adjustment',
-            'affected_members': affected_members,
-            'settings_applied': lighting_settings,
-            'timestamp': datetime.now().isoformat(),
-            'success': True
-        }
-    
-    def _execute_temperature_action(self, action: Dict[str, Any], affected_members: List[str]) -> Dict[str, Any]:
-        """Execute temperature adjustment action"""
-        temp_settings = {}
-        
-        for member_id in affected_members:
-            member_prefs = [p for p in self.preferences.values() 
-                          if p.member_id == member_id and p.category == PreferenceCategory.TEMPERATURE]
-            
-            if member_prefs:
-                pref = member_prefs[0]
-                temp_settings[member_id] = pref.preference_data
-        
+    def _execute_preference_action(self, category: PreferenceCategory, result_type: str,
+                                   affected_members: List[str]) -> Dict[str, Any]:
+        """Apply each affected member's preferences in one category (simplified simulation)"""
         return {
-            'action_type': 'temperature_adjustment',
+            'action_type': result_type,
             'affected_members': affected_members,
-            'settings_applied': temp_settings,
-            'timestamp': datetime.now().isoformat(),
-            'success': True
-        }
-    
-    def _execute_music_action(self, action: Dict[str, Any], affected_members: List[str]) -> Dict[str, Any]:
-        """Execute music action"""
-        music_settings = {}
-        
-        for member_id in affected_members:
-            member_prefs = [p for p in self.preferences.values() 
-                          if p.member_id == member_id and p.category == PreferenceCategory.MUSIC]
-            
-            if member_prefs:
-                pref = member_prefs[0]
-                music_settings[member_id] = pref.preference_data
-        
-        return {
-            'action_type': 'music_control',
-            'affected_members': affected_members,
-            'settings_applied': music_settings,
+            'settings_applied': self._collect_prefs(category, affected_members),
             'timestamp': datetime.now().isoformat(),
             'success': True
         }
@@ -1081,13 +1569,11 @@ class PersonalizationEngine:
             'success': True
         }
     
-    def _find_peak_hours(self, hours: List[int]) -> List[int]:
-        """Find peak usage hours"""
-        hour_counts = defaultdict(int)
-        for hour in hours:
-            hour_counts[hour] += 1
-        
-        return sorted(hour_counts.keys(), key=lambda h: hour_counts[h], reverse=True)[:3]
+    def _find_peak_hours(self, hour_counts: np.ndarray, hour_first_seen: np.ndarray) -> List[int]:
+        """Find peak usage hours from a 24-bucket histogram, ties broken by first use"""
+        used_hours = np.flatnonzero(hour_counts)
+        ranked = used_hours[np.lexsort((hour_first_seen[used_hours], -hour_counts[used_hours]))]
+        return ranked[:3].tolist()
     
     def _calculate_usage_trend(self, interactions: List[Dict]) -> str:
         """Calculate usage trend over time"""
@@ -1118,41 +1604,46 @@ class PersonalizationEngine:
                 for key, value in interaction['settings'].items():
                     settings[key].append(value)
         
-        # Calculate most common settings
+        # Calculate most common settings; ties go to the value seen first
         preferred = {}
         for key, values in settings.items():
             if values:
                 if isinstance(values[0], (int, float)):
-                    preferred[key] = statistics.mean(values)
+                    preferred[key] = float(np.mean(values))
                 else:
-                    preferred[key] = max(set(values), key=values.count)
+                    preferred[key] = Counter(values).most_common(1)[0][0]
         
         return preferred
     
-    def _calculate_confidence_trend(self, preference: PersonalPreference, interactions: List[Dict]) -> str:
+    def _calculate_confidence_trend(self, preference: PersonalPreference, columns: InteractionColumns) -> str:
         """Calculate confidence trend for a preference"""
         # Simplified confidence trend calculation
-        recent_interactions = [i for i in interactions if i['timestamp'] > preference.last_updated - timedelta(days=7)]
+        window_start = np.datetime64(preference.last_updated - timedelta(days=7), 'us')
+        recent_interactions = int(np.count_nonzero(columns.timestamps > window_start))
         
-        if len(recent_interactions) > 10:
+        if recent_interactions > 10:
             return "increasing"
-        elif len(recent_interactions) < 3:
+        elif recent_interactions < 3:
             return "decreasing"
         else:
             return "stable"
     
-    def _calculate_preference_stability(self, preference: PersonalPreference, interactions: List[Dict]) -> float:
+    def _calculate_preference_stability(self, preference: PersonalPreference, columns: InteractionColumns) -> float:
         """Calculate preference stability score"""
         # Simplified stability calculation
-        relevant_interactions = [i for i in interactions if i.get('device_id') in str(preference.preference_data)]
+        preference_text = str(preference.preference_data)
+        relevant = np.fromiter(
+            (device_id is not None and device_id in preference_text for device_id in columns.device_ids),
+            dtype=bool, count=len(columns)
+        )
         
-        if len(relevant_interactions) < 5:
+        if np.count_nonzero(relevant) < 5:
             return 0.5
         
-        satisfaction_scores = [i.get('satisfaction_score', 0.5) for i in relevant_interactions if i.get('satisfaction_score')]
+        satisfaction_scores = columns.satisfaction[relevant & columns.scored]
         
-        if satisfaction_scores:
-            variance = statistics.variance(satisfaction_scores) if len(satisfaction_scores) > 1 else 0
+        if satisfaction_scores.size:
+            variance = float(np.var(satisfaction_scores, ddof=1)) if satisfaction_scores.size > 1 else 0
             stability = max(0, 1 - variance)
             return stability
         
@@ -1164,9 +1655,11 @@ class PersonalizationEngine:
         if 'automation_acceptance' in patterns:
             acceptance = patterns['automation_acceptance']
             if acceptance.get('automation_preference', False):
-                member.automation_comfort = min(1.0, member.automation_comfort + 0.1)
+                comfort = min(1.0, member.automation_comfort + 0.1)
             else:
-                member.automation_comfort = max(0.0, member.automation_comfort - 0.05)
+                comfort = max(0.0, member.automation_comfort - 0.05)
+            self._adjust_agg("ac_sum", comfort - member.automation_comfort)
+            member.automation_comfort = comfort
         
         # Update last updated timestamp
         member.last_updated = datetime.now()
@@ -1174,43 +1667,53 @@ class PersonalizationEngine:
         # Save updated member
         self.save_family_member(member)
     
-    def _calculate_personalization_score(self, member_id: str) -> float:
+    def _calculate_personalization_score(self, member_id: str, now: Optional[datetime] = None) -> float:
+        """Personalization score for a member, reused until preferences change or the TTL passes"""
+        version = self._pref_version.get(member_id, 0)
+        tick = time.monotonic()
+        cached = self._score_cache.get(member_id)
+        if cached is not None and cached[0] == version and tick - cached[1] < PERSONALIZATION_SCORE_TTL:
+            return cached[2]
+        
+        score = self._compute_personalization_score(member_id, now)
+        self._score_cache[member_id] = (version, tick, score)
+        return score
+    
+    def _compute_personalization_score(self, member_id: str, now: Optional[datetime] = None) -> float:
         """Calculate overall personalization score for a member"""
-        member_preferences = [p for p in self.preferences.values() if p.member_id == member_id]
+        member_preferences = self._prefs_by_member.get(member_id, ())
         
         if not member_preferences:
             return 0.0
         
+        # Batched callers pass one `now` so every member shares the same recency cutoff
+        cutoff = (now or datetime.now()) - timedelta(days=30)
+        confidence_sum = 0.0
+        recent_updates = 0
+        for pref in member_preferences:
+            confidence_sum += pref.confidence
+            recent_updates += pref.last_updated > cutoff
+        
         # Calculate average confidence
-        avg_confidence = statistics.mean([p.confidence for p in member_preferences])
+        avg_confidence = confidence_sum / len(member_preferences)
         
         # Factor in number of preferences
         preference_coverage = min(1.0, len(member_preferences) / 10)  # Assume 10 is full coverage
         
         # Factor in recency of updates
-        recent_updates = len([p for p in member_preferences if p.last_updated > datetime.now() - timedelta(days=30)])
         recency_factor = recent_updates / len(member_preferences)
         
         return (avg_confidence * 0.5) + (preference_coverage * 0.3) + (recency_factor * 0.2)
     
     def log_interaction(self, member_id: str, interaction_type: str, device_id: str = None, 
                        action: str = None, context: str = None, satisfaction_score: float = None, notes: str = None):
-        """Log member interaction for learning"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO interaction_log 
-            (member_id, timestamp, interaction_type, device_id, action, context, satisfaction_score, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (member_id, datetime.now(), interaction_type, device_id, action, context, satisfaction_score, notes))
-        
-        conn.commit()
-        conn.close()
+        """Log member interaction for learning; the database write happens in the background"""
+        timestamp = datetime.now()
+        self._writer.put(LOG_INTERACTION_SQL, (member_id, timestamp, interaction_type, device_id, action, context, satisfaction_score, notes))
         
         # Add to in-memory storage
         self.interaction_history[member_id].append({
-            'timestamp': datetime.now(),
+            'timestamp': timestamp,
             'interaction_type': interaction_type,
             'device_id': device_id,
             'action': action,
@@ -1218,225 +1721,304 @@ class PersonalizationEngine:
             'satisfaction_score': satisfaction_score,
             'notes': notes
         })
-        
-        # Keep only recent data in memory
-        if len(self.interaction_history[member_id]) > 1000:
-            self.interaction_history[member_id].popleft()
     
     def log_context_change(self, context_type: ContextType, context_data: Dict[str, Any], triggered_rules: List[str]):
         """Log context changes"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO context_log 
-            (timestamp, context_type, context_data, triggered_rules, affected_members)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (
-            datetime.now(), context_type.value, json.dumps(context_data),
-            json.dumps(triggered_rules), json.dumps([])  # Would track affected members
+        self._writer.put(LOG_CONTEXT_SQL, (
+            datetime.now(), context_type.value, _dumps(context_data),
+            _dumps(triggered_rules), NO_AFFECTED_MEMBERS  # Would track affected members
         ))
-        
-        conn.commit()
-        conn.close()
     
     def start_personalization_engine(self):
         """Start the personalization engine with scheduled tasks"""
+        _warm_up_kernels()
+        
+        # A private scheduler keeps these jobs apart from other modules using the default one
+        scheduler = schedule.Scheduler()
+        scheduler.every(15).minutes.do(self._run_job, self.update_all_member_profiles)
+        scheduler.every().day.at("03:00").do(self._run_job, self.generate_daily_recommendations)
+        scheduler.every(6).hours.do(self._run_job, self.optimize_contextual_rules)
+        
         def run_personalization():
+            # Run every task once at startup, then on its own cadence
+            scheduler.run_all()
             while True:
-                # Run periodic personalization tasks
-                self.update_all_member_profiles()
-                self.generate_daily_recommendations()
-                self.optimize_contextual_rules()
-                
-                time.sleep(3600)  # Run every hour
+                scheduler.run_pending()
+                time.sleep(60)  # Check every minute
         
         # Start personalization engine in background thread
         personalization_thread = threading.Thread(target=run_personalization, daemon=True)
         personalization_thread.start()
-        logging.info("Personalization engine started")
+        
+        self._writer.start()
+        logger.info("Personalization engine started")
+    
+    @staticmethod
+    def _run_job(job):
+        """Run a scheduled task, logging failures so the other tasks keep their schedule"""
+        try:
+            job()
+        except Exception as e:
+            logger.error("Personalization task %s failed: %s", job.__name__, e)
+    
+    def flush(self):
+        """Wait until every queued write has been committed"""
+        self._writer.flush()
     
     def update_all_member_profiles(self):
         """Update all member profiles based on recent interactions"""
-        for member_id in self.family_members.keys():
-            recent_interactions = list(self.interaction_history[member_id])[-100:]  # Last 100 interactions
-            if recent_interactions:
-                self.analyze_member_behavior(member_id, recent_interactions)
+        member_ids = list(self.family_members.keys())
+        if not member_ids:
+            return
+        
+        # Members are analyzed independently, so their profiles update in parallel
+        now = datetime.now()
+        with ThreadPoolExecutor(max_workers=min(PROFILE_UPDATE_WORKERS, len(member_ids))) as executor:
+            list(executor.map(self._update_profile_from_history, member_ids, itertools.repeat(now)))
+    
+    def _update_profile_from_history(self, member_id: str, now: Optional[datetime] = None):
+        """Analyze a member's most recent interactions"""
+        history = self.interaction_history.get(member_id)
+        if history:
+            # The buffer already holds the analyzed fields as columns. Recommendations are left to the
+            # daily job so that the frequent profile updates don't pile them up
+            self.analyze_member_behavior(member_id, history.recent_columns(PROFILE_ANALYSIS_WINDOW), now,
+                                         generate_recommendations=False)
     
     def generate_daily_recommendations(self):
         """Generate daily personalized recommendations"""
+        now = datetime.now()
         for member_id in self.family_members.keys():
-            recommendations = self.generate_personalized_recommendations(member_id)
+            recommendations = self.generate_personalized_recommendations(member_id, now=now)
             if recommendations:
-                logging.info(f"Generated {len(recommendations)} recommendations for {member_id}")
+                logger.info("Generated %d recommendations for %s", len(recommendations), member_id)
     
     def optimize_contextual_rules(self):
         """Optimize contextual rules based on success rates"""
         for rule in self.contextual_rules.values():
             if rule.success_rate < 0.3:  # Low success rate
+                if rule.active:
+                    self._adjust_agg("ctx_active", -1)
                 rule.active = False
-                logging.info(f"Deactivated rule {rule.id} due to low success rate")
+                logger.info("Deactivated rule %s due to low success rate", rule.id)
             elif rule.success_rate > 0.8:  # High success rate
                 rule.priority = min(10, rule.priority + 1)  # Increase priority
+        
+        self._reindex_rules()
     
     def save_family_member(self, member: FamilyMember):
-        """Save family member to database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO family_members 
-            (id, name, age, personality_type, preferences, schedule, health_data, learning_style,
-             skill_level, interests, accessibility_needs, privacy_level, automation_comfort, created_date, last_updated)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        """Queue a family member save"""
+        self._writer.put(SAVE_MEMBER_SQL, self._member_row(member))
+    
+    def save_preference(self, preference: PersonalPreference):
+        """Queue a preference save, skipped when nothing but last_updated changed"""
+        self._bump_pref_version(preference.member_id)
+        row = self._preference_row(preference)
+        if self._saved_pref_rows.get(preference.id) == row[:-1]:
+            return
+        
+        self._saved_pref_rows[preference.id] = row[:-1]
+        self._writer.put(SAVE_PREFERENCE_SQL, row)
+    
+    def _bulk_save_members(self, conn: sqlite3.Connection, members: List[FamilyMember]):
+        """Save many family members with one executemany on an open connection"""
+        conn.executemany(SAVE_MEMBER_SQL, [self._member_row(member) for member in members])
+    
+    def _bulk_save_preferences(self, conn: sqlite3.Connection, preferences: List[PersonalPreference]):
+        """Save many preferences with one executemany on an open connection"""
+        rows = [self._preference_row(pref) for pref in preferences]
+        conn.executemany(SAVE_PREFERENCE_SQL, rows)
+        for row in rows:
+            self._saved_pref_rows[row[0]] = row[:-1]
+    
+    @staticmethod
+    def _member_row(member: FamilyMember) -> Tuple:
+        """Convert a family member to its family_members row"""
+        return (
             member.id, member.name, member.age, member.personality_type.value,
-            json.dumps(member.preferences), json.dumps(member.schedule), json.dumps(member.health_data),
-            member.learning_style, member.skill_level, json.dumps(member.interests),
-            json.dumps(member.accessibility_needs), member.privacy_level, member.automation_comfort,
+            _dumps(member.preferences), _dumps(member.schedule), _dumps(member.health_data),
+            member.learning_style, member.skill_level, _dumps(member.interests),
+            _dumps(member.accessibility_needs), member.privacy_level, member.automation_comfort,
             member.created_date, member.last_updated
-        ))
-        
-        conn.commit()
-        conn.close()
+        )
     
-    def save_preference(self, preference: PersonalPreference):
-        """Save preference to database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO personal_preferences 
-            (id, member_id, category, preference_data, confidence, context_dependent,
-             seasonal_variation, time_dependent, learned_from, priority, last_updated)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+    @staticmethod
+    def _preference_row(preference: PersonalPreference) -> Tuple:
+        """Convert a preference to its personal_preferences row"""
+        return (
             preference.id, preference.member_id, preference.category.value,
-            json.dumps(preference.preference_data), preference.confidence, preference.context_dependent,
+            _dumps(preference.preference_data), preference.confidence, preference.context_dependent,
             preference.seasonal_variation, preference.time_dependent, preference.learned_from,
             preference.priority, preference.last_updated
-        ))
-        
-        conn.commit()
-        conn.close()
+        )
     
-    def save_contextual_rule(self, rule: ContextualRule):
-        """Save contextual rule to database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO contextual_rules 
-            (id, name, context_type, conditions, actions, affected_members, priority, active, success_rate, created_date)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            rule.id, rule.name, rule.context_type.value, json.dumps(rule.conditions),
-            json.dumps(rule.actions), json.dumps(rule.affected_members), rule.priority,
+    @staticmethod
+    def _rule_row(rule: ContextualRule) -> Tuple:
+        """Convert a contextual rule to its contextual_rules row"""
+        return (
+            rule.id, rule.name, rule.context_type.value, _dumps(rule.conditions),
+            _dumps(rule.actions), _dumps(rule.affected_members), rule.priority,
             rule.active, rule.success_rate, rule.created_date
-        ))
-        
-        conn.commit()
-        conn.close()
+        )
     
-    def save_recommendation(self, recommendation: PersonalizedRecommendation):
-        """Save recommendation to database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO personalized_recommendations 
-            (id, member_id, recommendation_type, title, description, benefits, implementation_steps,
-             estimated_cost, difficulty_level, time_to_implement, personalization_score, context_relevance, created_date)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+    @staticmethod
+    def _recommendation_row(recommendation: PersonalizedRecommendation) -> Tuple:
+        """Convert a recommendation to its personalized_recommendations row"""
+        return (
             recommendation.id, recommendation.member_id, recommendation.recommendation_type,
-            recommendation.title, recommendation.description, json.dumps(recommendation.benefits),
-            json.dumps(recommendation.implementation_steps), recommendation.estimated_cost,
+            recommendation.title, recommendation.description, _dumps(recommendation.benefits),
+            _dumps(recommendation.implementation_steps), recommendation.estimated_cost,
             recommendation.difficulty_level, recommendation.time_to_implement,
             recommendation.personalization_score, recommendation.context_relevance, recommendation.created_date
-        ))
-        
-        conn.commit()
-        conn.close()
+        )
+    
+    def save_contextual_rule(self, rule: ContextualRule):
+        """Queue a contextual rule save"""
+        self._writer.put(SAVE_RULE_SQL, self._rule_row(rule))
+    
+    def save_recommendation(self, recommendation: PersonalizedRecommendation):
+        """Queue a recommendation save"""
+        self._writer.put(SAVE_RECOMMENDATION_SQL, self._recommendation_row(recommendation))
     
     def load_data(self):
         """Load existing data from database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        conn = self._conn
         
+        # Rows are streamed from the cursor rather than materialized with fetchall
         # Load family members
-        cursor.execute('SELECT * FROM family_members')
-        for row in cursor.fetchall():
+        for row in conn.execute('SELECT * FROM family_members'):
             member = FamilyMember(
                 id=row[0], name=row[1], age=row[2], personality_type=PersonalityType(row[3]),
-                preferences=json.loads(row[4]), schedule=json.loads(row[5]), health_data=json.loads(row[6]),
-                learning_style=row[7], skill_level=row[8], interests=json.loads(row[9]),
-                accessibility_needs=json.loads(row[10]), privacy_level=row[11], automation_comfort=row[12],
+                preferences=_loads(row[4]), schedule=_loads(row[5]), health_data=_loads(row[6]),
+                learning_style=row[7], skill_level=row[8], interests=_loads(row[9]),
+                accessibility_needs=_loads(row[10]), privacy_level=row[11], automation_comfort=row[12],
                 created_date=datetime.fromisoformat(row[13]), last_updated=datetime.fromisoformat(row[14])
             )
-            self.family_members[member.id] = member
-        
-        conn.close()
-        logging.info(f"Loaded {len(self.family_members)} family members from database")
+            self._store_member(member)
+        
+        # Load preferences so a populated database does not need reseeding
+        for row in conn.execute('SELECT * FROM personal_preferences'):
+            self._index_preference(PersonalPreference(
+                id=row[0], member_id=row[1], category=PreferenceCategory(row[2]),
+                preference_data=_loads(row[3]), confidence=row[4], context_dependent=bool(row[5]),
+                seasonal_variation=bool(row[6]), time_dependent=bool(row[7]), learned_from=sys.intern(row[8]),
+                priority=row[9], last_updated=datetime.fromisoformat(row[10])
+            ))
+        
+        logger.info("Loaded %d family members and %d preferences from database",
+                    len(self.family_members), len(self.preferences))
+    
+    @property
+    def dashboard_version(self) -> str:
+        """Version token of the dashboard, also its ETag; changes whenever the dashboard would and across restarts"""
+        return f"{self._id_base}-{self._dash_version}"
     
-    def get_dashboard_data(self) -> Dict[str, Any]:
-        """Get comprehensive personalization dashboard data"""
+    def get_dashboard_data(self, as_bytes: bool = False,
+                           since_version: Optional[str] = None) -> Union[Dict[str, Any], bytes, None]:
+        """Get comprehensive personalization dashboard data; the returned dict is shared and must not be modified"""
+        # Pollers that already hold the current version get None instead of a rebuild
+        if since_version is not None and since_version == self.dashboard_version:
+            return None
+        
+        if as_bytes:
+            payload = self._dash_payload
+            if payload is not None and payload[0] == self._dash_version:
+                return payload[1]
+        else:
+            snapshot = self._dash_snapshot
+            if snapshot is not None and snapshot[0] == self._dash_version:
+                return snapshot[1]
+        
+        with self._agg_lock:
+            version = self._dash_version
+            snapshot = self._dash_snapshot
+            if snapshot is None or snapshot[0] != version:
+                snapshot = (version, self._build_dashboard())
+                self._dash_snapshot = snapshot
+            if not as_bytes:
+                return snapshot[1]
+            
+            # Keys are enum values or type strings, so orjson can encode the dict directly
+            payload = (version, orjson.dumps(snapshot[1]))
+            self._dash_payload = payload
+        return payload[1]
+    
+    def _build_dashboard(self) -> Dict[str, Any]:
+        """Format the running aggregates; the caller holds the aggregate lock"""
+        # The aggregates are maintained on every mutation, so this only formats them
+        agg = self._agg
         total_members = len(self.family_members)
         total_preferences = len(self.preferences)
         total_rules = len(self.contextual_rules)
-        active_rules = len([r for r in self.contextual_rules.values() if r.active])
         
         return {
+            "_version": self.dashboard_version,
             "family_members": {
                 "total": total_members,
                 "personality_distribution": {
-                    pt.value: len([m for m in self.family_members.values() if m.personality_type == pt])
-                    for pt in PersonalityType
+                    value: agg["pt_counts"].get(pt, 0)
+                    for pt, value in PERSONALITY_TYPE_ITEMS
                 },
-                "average_automation_comfort": statistics.mean([m.automation_comfort for m in self.family_members.values()]) if total_members > 0 else 0,
+                "average_automation_comfort": agg["ac_sum"] / total_members if total_members > 0 else 0,
                 "skill_level_distribution": {
-                    level: len([m for m in self.family_members.values() if m.skill_level == level])
-                    for level in ["beginner", "intermediate", "advanced"]
+                    level: agg["skill_counts"].get(level, 0)
+                    for level in SKILL_LEVELS
                 }
             },
             "preferences": {
                 "total": total_preferences,
                 "by_category": {
-                    cat.value: len([p for p in self.preferences.values() if p.category == cat])
-                    for cat in PreferenceCategory
+                    value: agg["pref_cat"].get(cat, 0)
+                    for cat, value in PREFERENCE_CATEGORY_ITEMS
                 },
-                "average_confidence": statistics.mean([p.confidence for p in self.preferences.values()]) if total_preferences > 0 else 0,
-                "learned_preferences": len([p for p in self.preferences.values() if p.learned_from == "observed"])
+                "average_confidence": agg["pref_conf_sum"] / total_preferences if total_preferences > 0 else 0,
+                "learned_preferences": agg["pref_observed"]
             },
             "contextual_rules": {
                 "total": total_rules,
-                "active": active_rules,
+                "active": agg["ctx_active"],
                 "by_context": {
-                    ct.value: len([r for r in self.contextual_rules.values() if r.context_type == ct])
-                    for ct in ContextType
+                    value: agg["ctx_type"].get(ct, 0)
+                    for ct, value in CONTEXT_TYPE_ITEMS
                 },
-                "average_success_rate": statistics.mean([r.success_rate for r in self.contextual_rules.values()]) if total_rules > 0 else 0
+                "average_success_rate": agg["ctx_success_sum"] / total_rules if total_rules > 0 else 0
             },
             "recommendations": {
                 "total": len(self.recommendations),
-                "by_type": {
-                    rec_type: len([r for r in self.recommendations.values() if r.recommendation_type == rec_type])
-                    for rec_type in set(r.recommendation_type for r in self.recommendations.values())
-                },
-                "high_personalization": len([r for r in self.recommendations.values() if r.personalization_score > 0.8])
+                "by_type": {rec_type: count for rec_type, count in agg["rec_type"].items() if count > 0},
+                "high_personalization": agg["rec_high"]
             }
         }
 
 
-# Global personalization engine instance
-personalization_engine = PersonalizationEngine()
+# Global personalization engine instance, created on first access so importing stays cheap
+_personalization_engine: Optional[PersonalizationEngine] = None
+_personalization_engine_lock = threading.Lock()
+
+def get_personalization_engine() -> PersonalizationEngine:
+    """Return the global engine, creating it on first use"""
+    global _personalization_engine
+    if _personalization_engine is None:
+        with _personalization_engine_lock:
+            if _personalization_engine is None:
+                _personalization_engine = PersonalizationEngine()
+    return _personalization_engine
+
+def __getattr__(name: str):
+    # Module attribute hook (PEP 562): `personalization_engine` resolves lazily
+    if name == "personalization_engine":
+        return get_personalization_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def initialize_personalization_system():
     """Initialize the personalization system"""
-    logging.info("Personalization system initialized with sample family members")
+    get_personalization_engine()
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Personalization system initialized with sample family members")
 
 if __name__ == "__main__":
     initialize_personalization_system()
+    personalization_engine = get_personalization_engine()
     
     # Example usage
     print("Personalization Engine initialized")
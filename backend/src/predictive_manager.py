@@ -3,19 +3,200 @@ Predictive Life Management & Behavioral Learning System
 Advanced predictive capabilities for home automation and life optimization
 """
 
-import json
+import orjson
+import os
+import heapq
 import time
 import logging
 import sqlite3
 import threading
 import schedule
+from functools import lru_cache
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Any, Sequence, Tuple
+from dataclasses import dataclass, fields, replace
 from enum import Enum
 import numpy as np
 from collections import defaultdict, deque
-import statistics
+
+try:
+    from src.sqlite_writer import QueuedWriter
+except ImportError:  # run as a script from inside src/
+    from sqlite_writer import QueuedWriter
+
+# TECHCRAFT_NUMBA=0 skips the numba import and JIT compile, which short-lived processes never earn back
+NUMBA_AVAILABLE = False
+if os.environ.get('TECHCRAFT_NUMBA', '1') == '1':
+    try:
+        from numba import njit
+        NUMBA_AVAILABLE = True
+    except ImportError:
+        pass
+
+# JSON columns accept the int-keyed dicts and NumPy scalars the analyzers produce
+JSON_COLUMN_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+def _dumps(obj: Any) -> str:
+    """Encode a value for a TEXT JSON column"""
+    return orjson.dumps(obj, option=JSON_COLUMN_OPTIONS).decode()
+
+_loads = orjson.loads
+
+SQLITE_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA mmap_size=268435456',
+    'PRAGMA cache_size=-65536',
+)
+
+SAVE_PREDICTION_SQL = '''
+    INSERT OR REPLACE INTO predictions 
+    (id, prediction_type, target, predicted_event, confidence, predicted_date, 
+     impact_level, recommended_actions, cost_impact, prevention_cost, created_date, accuracy_score)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+SAVE_BEHAVIOR_PATTERN_SQL = '''
+    INSERT OR REPLACE INTO behavior_patterns 
+    (id, user_id, pattern_type, pattern_data, confidence, last_updated, 
+     frequency, seasonal_variation, automation_potential)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+SAVE_LIFE_OPTIMIZATION_SQL = '''
+    INSERT OR REPLACE INTO life_optimizations 
+    (id, category, current_state, optimized_state, improvement_percentage, 
+     implementation_steps, estimated_savings, difficulty_level, priority_score, created_date)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+LOG_DEVICE_USAGE_SQL = '''
+    INSERT INTO device_usage_log 
+    (device_id, timestamp, action, usage_duration, energy_consumed, user_id, context)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+LOG_USER_ACTIVITY_SQL = '''
+    INSERT INTO user_activity_log 
+    (user_id, timestamp, activity_type, location, duration, context, device_id)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+# Log rows and saves are queued and committed by a background thread in batches
+WRITE_QUEUE_SIZE = 16384
+WRITE_BATCH_ROWS = 256
+WRITE_FLUSH_INTERVAL = 0.1  # seconds
+
+# 1970-01-01 was a Thursday; with Monday == 0 epoch day 0 maps to 3
+EPOCH_WEEKDAY = 3
+
+# Activity ids stay below this base so a window of three packs into one integer key
+SEQUENCE_ID_BASE = 65537
+
+# Energy usage multipliers by month (index 0 is January)
+SEASONAL_ENERGY_FACTORS = np.array([
+    1.4,  # January - high heating
+    1.3,  # February
+    1.1,  # March
+    1.0,  # April
+    0.9,  # May
+    0.8,  # June
+    0.8,  # July
+    0.8,  # August
+    0.9,  # September
+    1.0,  # October
+    1.2,  # November
+    1.4,  # December - high heating
+])
+
+# London weather patterns: higher usage in winter for heating, lower in summer with minimal cooling
+WEATHER_IMPACT_FACTORS = np.array([1.2, 1.2, 1.0, 1.0, 1.0, 0.9, 0.9, 0.9, 1.0, 1.0, 1.0, 1.2])
+
+# Replacement cost by device type, matched as a substring of the device id in this order
+REPLACEMENT_COSTS = (
+    ('light', 25.0),
+    ('thermostat', 150.0),
+    ('camera', 100.0),
+    ('plug', 15.0),
+    ('speaker', 50.0),
+    ('vacuum', 200.0),
+)
+DEFAULT_REPLACEMENT_COST = 75.0
+MAINTENANCE_COST_RATIO = 0.15  # Maintenance typically 15% of replacement cost
+
+@lru_cache(maxsize=4096)
+def _replacement_cost(device_id: str) -> float:
+    """Replacement cost for a device id, resolved once per id"""
+    device_id = device_id.lower()
+    for device_type, cost in REPLACEMENT_COSTS:
+        if device_type in device_id:
+            return cost
+    return DEFAULT_REPLACEMENT_COST
+
+# Usage events kept in memory per device, and the most recent slice used for failure analysis
+USAGE_HISTORY_LIMIT = 1000
+FAILURE_WINDOW = 30
+
+# Per-activity columns pulled out of the history dicts in one pass for vectorized time analysis
+ACTIVITY_TIME_DTYPE = np.dtype([('activity_id', np.int32), ('hour', np.int8), ('minute', np.int8)])
+
+# Cached behavior patterns also expire because they carry creation times and time-based ids
+BEHAVIOR_PATTERN_TTL = 60  # seconds
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _failure_factors(energy, error):
+        """Efficiency trend (0-1, 1 is improving) and error rate over a window of usage events"""
+        n_events = energy.shape[0]
+        efficiency_trend = 0.5
+        if n_events >= 10:
+            # Least-squares slope of energy against index, over the events that recorded energy
+            n = 0
+            sum_x = 0.0
+            sum_y = 0.0
+            sum_xx = 0.0
+            sum_xy = 0.0
+            for i in range(n_events):
+                e = energy[i]
+                if e == e and e != 0.0:
+                    sum_x += n
+                    sum_y += e
+                    sum_xx += n * n
+                    sum_xy += n * e
+                    n += 1
+            if n >= 5:
+                slope = (n * sum_xy - sum_x * sum_y) / (n * sum_xx - sum_x * sum_x)
+                efficiency_trend = max(0.0, min(1.0, 0.5 - slope * 0.1))
+        
+        error_rate = 0.0
+        if n_events > 0:
+            errors = 0
+            for i in range(n_events):
+                errors += error[i]
+            error_rate = min(1.0, errors / n_events)
+        return efficiency_trend, error_rate
+else:
+    def _failure_factors(energy, error):
+        """Efficiency trend (0-1, 1 is improving) and error rate over a window of usage events"""
+        n_events = len(energy)
+        efficiency_trend = 0.5
+        if n_events >= 10:
+            values = energy[~np.isnan(energy) & (energy != 0)]
+            n = len(values)
+            if n >= 5:
+                x = np.arange(n, dtype=np.float64)
+                sum_x = x.sum()
+                slope = (n * np.dot(x, values) - sum_x * values.sum()) / (n * np.dot(x, x) - sum_x * sum_x)
+                efficiency_trend = max(0.0, min(1.0, 0.5 - float(slope) * 0.1))
+        
+        error_rate = min(1.0, np.count_nonzero(error) / n_events) if n_events else 0.0
+        return efficiency_trend, error_rate
+
+def _warm_up_kernels():
+    """Compile the numba kernels for the dtypes the analyzers pass, before any request needs them"""
+    if NUMBA_AVAILABLE:
+        _failure_factors(np.zeros(1, dtype=np.float64), np.zeros(1, dtype=np.bool_))
 
 class PredictionType(Enum):
     DEVICE_FAILURE = "device_failure"
@@ -31,7 +212,7 @@ class RoutineType(Enum):
     SEASONAL = "seasonal"
     EVENT_BASED = "event_based"
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Prediction:
     id: str
     prediction_type: PredictionType
@@ -40,11 +221,14 @@ class Prediction:
     confidence: float  # 0-1
     predicted_date: datetime
     impact_level: str  # low, medium, high, critical
-    recommended_actions: List[str]
+    recommended_actions: Tuple[str, ...]
     cost_impact: float  # estimated cost in pounds
     prevention_cost: float  # cost to prevent the issue
     created_date: datetime
-    accuracy_score: Optional[float] = None  # set after event occurs
+    accuracy_score: Optional[float] = None  # set after event occurs, via record_prediction_accuracy
+
+# Declared prediction fields, used to build dashboard dicts without asdict's recursive deep copy
+PREDICTION_FIELDS = fields(Prediction)
 
 @dataclass
 class BehaviorPattern:
@@ -65,7 +249,7 @@ class LifeOptimization:
     current_state: Dict[str, Any]
     optimized_state: Dict[str, Any]
     improvement_percentage: float
-    implementation_steps: List[str]
+    implementation_steps: Sequence[str]
     estimated_savings: Dict[str, float]  # time, money, energy
     difficulty_level: str
     priority_score: float
@@ -79,28 +263,234 @@ class SeasonalAdjustment:
     maintenance_tasks: List[str]
     comfort_preferences: Dict[str, Any]
 
+# Fixed fields of each life optimization; generators only add the id.
+# Every optimization built from a template shares its dicts, so treat them as read-only
+ENERGY_CURRENT_DAILY_KWH = 25.0  # kWh/day average
+ENERGY_OPTIMIZED_DAILY_KWH = 18.0  # Potential optimized usage
+
+ENERGY_OPTIMIZATION_TEMPLATE = dict(
+    category="energy",
+    current_state={
+        'daily_usage_kwh': ENERGY_CURRENT_DAILY_KWH,
+        'monthly_cost_gbp': ENERGY_CURRENT_DAILY_KWH * 30 * 0.28,
+        'efficiency_score': 65
+    },
+    optimized_state={
+        'daily_usage_kwh': ENERGY_OPTIMIZED_DAILY_KWH,
+        'monthly_cost_gbp': ENERGY_OPTIMIZED_DAILY_KWH * 30 * 0.28,
+        'efficiency_score': 85
+    },
+    improvement_percentage=28.0,
+    implementation_steps=(
+        "Install smart thermostats with learning algorithms",
+        "Upgrade to LED lighting with motion sensors",
+        "Add smart power strips to eliminate phantom loads",
+        "Implement time-of-use energy scheduling",
+        "Install smart water heater controller",
+    ),
+    estimated_savings={
+        'money_monthly_gbp': (ENERGY_CURRENT_DAILY_KWH - ENERGY_OPTIMIZED_DAILY_KWH) * 30 * 0.28,
+        'energy_monthly_kwh': (ENERGY_CURRENT_DAILY_KWH - ENERGY_OPTIMIZED_DAILY_KWH) * 30,
+        'co2_monthly_kg': (ENERGY_CURRENT_DAILY_KWH - ENERGY_OPTIMIZED_DAILY_KWH) * 30 * 0.233
+    },
+    difficulty_level="medium",
+    priority_score=8.5
+)
+
+TIME_OPTIMIZATION_TEMPLATE = dict(
+    category="time",
+    current_state={
+        'daily_manual_tasks_minutes': 120,
+        'automation_level': 30
+    },
+    optimized_state={
+        'daily_manual_tasks_minutes': 45,
+        'automation_level': 80
+    },
+    improvement_percentage=62.5,
+    implementation_steps=(
+        "Automate morning routine with smart lighting and coffee maker",
+        "Install robotic vacuum with scheduling",
+        "Set up automated grocery ordering based on consumption",
+        "Implement voice-controlled home management",
+        "Add smart locks and security automation",
+    ),
+    estimated_savings={
+        'time_daily_minutes': 75,
+        'time_monthly_hours': 37.5,
+        'time_yearly_hours': 456
+    },
+    difficulty_level="easy",
+    priority_score=9.0
+)
+
+COMFORT_OPTIMIZATION_TEMPLATE = dict(
+    category="comfort",
+    current_state={
+        'temperature_consistency': 70,
+        'lighting_quality': 65,
+        'air_quality_score': 75,
+        'noise_level': 60
+    },
+    optimized_state={
+        'temperature_consistency': 95,
+        'lighting_quality': 90,
+        'air_quality_score': 90,
+        'noise_level': 85
+    },
+    improvement_percentage=25.0,
+    implementation_steps=(
+        "Install zoned climate control system",
+        "Add circadian rhythm lighting",
+        "Implement air quality monitoring and purification",
+        "Install sound masking and noise reduction",
+        "Add humidity control automation",
+    ),
+    estimated_savings={
+        'comfort_score_improvement': 25,
+        'sleep_quality_improvement': 20,
+        'productivity_improvement': 15
+    },
+    difficulty_level="medium",
+    priority_score=7.5
+)
+
+COST_OPTIMIZATION_TEMPLATE = dict(
+    category="cost",
+    current_state={
+        'monthly_utilities_gbp': 180,
+        'monthly_maintenance_gbp': 50,
+        'monthly_waste_gbp': 25
+    },
+    optimized_state={
+        'monthly_utilities_gbp': 135,
+        'monthly_maintenance_gbp': 30,
+        'monthly_waste_gbp': 10
+    },
+    improvement_percentage=30.0,
+    implementation_steps=(
+        "Implement dynamic energy pricing optimization",
+        "Add predictive maintenance to prevent costly repairs",
+        "Install water usage monitoring and leak detection",
+        "Optimize heating/cooling schedules",
+        "Implement bulk buying coordination with neighbors",
+    ),
+    estimated_savings={
+        'money_monthly_gbp': 80,
+        'money_yearly_gbp': 960
+    },
+    difficulty_level="medium",
+    priority_score=8.8
+)
+
+HEALTH_OPTIMIZATION_TEMPLATE = dict(
+    category="health",
+    current_state={
+        'air_quality_score': 75,
+        'sleep_environment_score': 70,
+        'activity_encouragement': 40,
+        'stress_reduction': 60
+    },
+    optimized_state={
+        'air_quality_score': 95,
+        'sleep_environment_score': 90,
+        'activity_encouragement': 80,
+        'stress_reduction': 85
+    },
+    improvement_percentage=30.0,
+    implementation_steps=(
+        "Install comprehensive air quality monitoring",
+        "Optimize bedroom environment for sleep quality",
+        "Add activity reminders and standing desk automation",
+        "Implement stress-reducing lighting and sound",
+        "Monitor and optimize indoor plant ecosystem",
+    ),
+    estimated_savings={
+        'health_score_improvement': 30,
+        'sleep_quality_improvement': 25,
+        'stress_reduction_percentage': 20
+    },
+    difficulty_level="easy",
+    priority_score=8.0
+)
+
+class UsageRing:
+    """Fixed-capacity ring of a device's usage events, one NumPy column per field; the oldest is overwritten"""
+    __slots__ = ('capacity', 'timestamps', 'duration', 'energy', 'error', 'head', 'size')
+    
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.timestamps = np.empty(capacity, dtype='datetime64[us]')
+        self.duration = np.empty(capacity, dtype=np.float64)  # NaN when not recorded
+        self.energy = np.empty(capacity, dtype=np.float64)  # NaN when not recorded
+        self.error = np.empty(capacity, dtype=np.bool_)  # context mentioned an error
+        self.head = 0  # next slot to write
+        self.size = 0
+    
+    def append(self, timestamp: datetime, duration: Optional[float], energy: Optional[float], is_error: bool):
+        slot = self.head
+        self.timestamps[slot] = timestamp
+        self.duration[slot] = np.nan if duration is None else duration
+        self.energy[slot] = np.nan if energy is None else energy
+        self.error[slot] = is_error
+        self.head = (slot + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+    
+    def recent(self, last: int) -> Tuple[np.ndarray, np.ndarray]:
+        """The last events' energy and error columns, oldest first; views into the ring unless they wrap"""
+        count = min(last, self.size)
+        start = (self.head - count) % self.capacity
+        if start + count <= self.capacity:
+            return self.energy[start:start + count], self.error[start:start + count]
+        order = (start + np.arange(count)) % self.capacity
+        return self.energy[order], self.error[order]
+    
+    def __len__(self) -> int:
+        return self.size
+
 class PredictiveManager:
     def __init__(self, db_path: str = "predictive_data.db"):
         self.db_path = db_path
         self.predictions: Dict[str, Prediction] = {}
+        # Dashboard dict per stored prediction; predictions are frozen, so a view only changes on replacement
+        self._prediction_views: Dict[str, Dict[str, Any]] = {}
         self.behavior_patterns: Dict[str, BehaviorPattern] = {}
         self.life_optimizations: List[LifeOptimization] = []
+        
+        # Dashboard counts kept in step with the collections above, so the dashboard never rescans them
+        self._agg_lock = threading.Lock()
+        self._agg: Dict[str, Any] = {
+            "pred_high": 0, "bp_high_conf": 0, "bp_auto_ready": 0, "opt_high": 0, "opt_savings": 0,
+        }
         self.seasonal_adjustments: Dict[str, SeasonalAdjustment] = {}
         
         # Data storage for pattern recognition
-        self.device_usage_history = defaultdict(deque)
+        self.device_usage_history = defaultdict(lambda: UsageRing(USAGE_HISTORY_LIMIT))
         self.energy_usage_history = deque(maxlen=10000)
         self.user_activity_history = defaultdict(deque)
+        self._activity_ids: Dict[str, int] = {}  # activity type -> dense id used by sequence analysis
+        self._activity_names: List[str] = []  # dense id -> activity type
+        self._activity_lock = threading.Lock()
+        self._activity_version: Dict[str, int] = {}  # user_id -> activities logged, bumped per log call
+        self._pattern_cache: Dict[str, Tuple[int, float, List[BehaviorPattern]]] = {}  # user_id -> (version, computed_at, patterns)
         self.weather_history = deque(maxlen=1000)
         
         self.init_database()
         self.load_data()
         self.start_prediction_engine()
         self.setup_seasonal_adjustments()
+        
+        self._writer.start()
     
     def init_database(self):
         """Initialize SQLite database for predictive data"""
-        conn = sqlite3.connect(self.db_path)
+        # Single-row writes go through the queued writer, which has its own connection
+        self._writer = QueuedWriter(self.db_path, SQLITE_PRAGMAS, WRITE_QUEUE_SIZE,
+                                    WRITE_BATCH_ROWS, WRITE_FLUSH_INTERVAL)
+        
+        # Everything else uses one lazily opened connection per thread
+        self._tls = threading.local()
+        conn = self._conn
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -170,85 +560,108 @@ class PredictiveManager:
                 activity_type TEXT NOT NULL,
                 location TEXT,
                 duration REAL,
-                context TEXT
+                context TEXT,
+                device_id TEXT
             )
         ''')
         
+        # Databases created before device_id was split out of the context lack the column
+        cursor.execute('PRAGMA table_info(user_activity_log)')
+        if 'device_id' not in {row[1] for row in cursor.fetchall()}:
+            cursor.execute('ALTER TABLE user_activity_log ADD COLUMN device_id TEXT')
+        
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_device_usage_device_ts ON device_usage_log(device_id, timestamp)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_user_activity_user_ts ON user_activity_log(user_id, timestamp)')
+        
         conn.commit()
-        conn.close()
+    
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """The calling thread's connection, opened and tuned on first use"""
+        conn = getattr(self._tls, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path)
+            for pragma in SQLITE_PRAGMAS:
+                conn.execute(pragma)
+            self._tls.conn = conn
+        return conn
     
     def log_device_usage(self, device_id: str, action: str, usage_duration: float = None, 
                         energy_consumed: float = None, user_id: str = None, context: str = None):
         """Log device usage for pattern recognition"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO device_usage_log 
-            (device_id, timestamp, action, usage_duration, energy_consumed, user_id, context)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (device_id, datetime.now(), action, usage_duration, energy_consumed, user_id, context))
+        now = datetime.now()
+        self._writer.put(LOG_DEVICE_USAGE_SQL, (device_id, now, action, usage_duration,
+                                              energy_consumed, user_id, context))
         
-        conn.commit()
-        conn.close()
-        
-        # Add to in-memory storage for real-time analysis
-        self.device_usage_history[device_id].append({
-            'timestamp': datetime.now(),
-            'action': action,
-            'duration': usage_duration,
-            'energy': energy_consumed,
-            'user': user_id,
-            'context': context
-        })
-        
-        # Keep only recent data in memory
-        if len(self.device_usage_history[device_id]) > 1000:
-            self.device_usage_history[device_id].popleft()
+        # Add to in-memory storage for real-time analysis; the ring keeps only the most recent events
+        self.device_usage_history[device_id].append(
+            now, usage_duration, energy_consumed, bool(context) and 'error' in context.lower()
+        )
     
     def log_user_activity(self, user_id: str, activity_type: str, location: str = None, 
                          duration: float = None, context: str = None):
         """Log user activity for behavioral pattern recognition"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO user_activity_log 
-            (user_id, timestamp, activity_type, location, duration, context)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (user_id, datetime.now(), activity_type, location, duration, context))
-        
-        conn.commit()
-        conn.close()
+        now = datetime.now()
+        device_id = self._context_device_id(context)
+        self._writer.put(LOG_USER_ACTIVITY_SQL, (user_id, now, activity_type, location,
+                                               duration, context, device_id))
         
         # Add to in-memory storage
         self.user_activity_history[user_id].append({
-            'timestamp': datetime.now(),
+            'timestamp': now,
             'activity': activity_type,
+            'activity_id': self._activity_id(activity_type),
             'location': location,
             'duration': duration,
-            'context': context
+            'context': context,
+            'device_id': device_id
         })
         
         if len(self.user_activity_history[user_id]) > 1000:
             self.user_activity_history[user_id].popleft()
+        self._activity_version[user_id] = self._activity_version.get(user_id, 0) + 1
+    
+    @staticmethod
+    def _context_device_id(context: Optional[str]) -> Optional[str]:
+        """Device referenced by an activity context, given as JSON with a device_id key or as 'device:<id>,...'"""
+        if not context or 'device' not in context:
+            return None
+        if context.startswith('{'):
+            try:
+                return _loads(context).get('device_id')
+            except ValueError:
+                pass
+        _, found, rest = context.partition('device:')
+        return rest.split(',')[0] if found else None
+    
+    def _activity_id(self, activity_type: str) -> int:
+        """Dense integer id for an activity type, assigned on first sight"""
+        activity_id = self._activity_ids.get(activity_type)
+        if activity_id is None:
+            with self._activity_lock:
+                activity_id = self._activity_ids.get(activity_type)
+                if activity_id is None:
+                    activity_id = len(self._activity_names)
+                    self._activity_names.append(activity_type)
+                    self._activity_ids[activity_type] = activity_id
+        return activity_id
+    
+    def flush(self):
+        """Wait until every queued write has been committed"""
+        self._writer.flush()
     
     def analyze_device_failure_patterns(self, device_id: str) -> Optional[Prediction]:
         """Predict device failures based on usage patterns and performance metrics"""
-        if device_id not in self.device_usage_history:
-            return None
-        
-        usage_data = list(self.device_usage_history[device_id])
-        if len(usage_data) < 50:  # Need sufficient data
+        ring = self.device_usage_history.get(device_id)
+        if ring is None or len(ring) < 50:  # Need sufficient data
             return None
         
-        # Analyze failure indicators
-        recent_data = usage_data[-30:]  # Last 30 usage events
+        # Analyze failure indicators over the last 30 usage events
+        energy, errors = ring.recent(FAILURE_WINDOW)
         
         # Calculate failure risk factors
-        energy_efficiency_trend = self._calculate_efficiency_trend(recent_data)
-        usage_frequency_change = self._calculate_frequency_change(usage_data)
-        error_rate = self._calculate_error_rate(recent_data)
+        energy_efficiency_trend, error_rate = _failure_factors(energy, errors)
+        usage_frequency_change = self._calculate_frequency_change(len(ring))
         
         # Combine factors to calculate failure probability
         failure_probability = (
@@ -268,12 +681,12 @@ class PredictiveManager:
                 confidence=failure_probability,
                 predicted_date=predicted_date,
                 impact_level="high" if failure_probability > 0.8 else "medium",
-                recommended_actions=[
+                recommended_actions=(
                     "Schedule preventive maintenance",
                     "Monitor device performance closely",
                     "Prepare replacement options",
                     "Check warranty status"
-                ],
+                ),
                 cost_impact=self._estimate_replacement_cost(device_id),
                 prevention_cost=self._estimate_maintenance_cost(device_id),
                 created_date=datetime.now()
@@ -284,7 +697,19 @@ class PredictiveManager:
         return None
     
     def analyze_behavioral_patterns(self, user_id: str) -> List[BehaviorPattern]:
-        """Analyze user behavior to identify automation opportunities"""
+        """Analyze user behavior to identify automation opportunities, reused until new activity or the TTL passes"""
+        version = self._activity_version.get(user_id, 0)
+        tick = time.monotonic()
+        cached = self._pattern_cache.get(user_id)
+        if cached is not None and cached[0] == version and tick - cached[1] < BEHAVIOR_PATTERN_TTL:
+            return list(cached[2])
+        
+        patterns = self._compute_behavioral_patterns(user_id)
+        self._pattern_cache[user_id] = (version, tick, patterns)
+        return list(patterns)
+    
+    def _compute_behavioral_patterns(self, user_id: str) -> List[BehaviorPattern]:
+        """Run every behavior analyzer over a user's activity history"""
         if user_id not in self.user_activity_history:
             return []
         
@@ -321,76 +746,62 @@ class PredictiveManager:
         # Analyze historical patterns
         daily_patterns = self._analyze_daily_energy_patterns()
         weekly_patterns = self._analyze_weekly_energy_patterns()
-        seasonal_factors = self._get_seasonal_energy_factors()
         
-        predictions = {}
-        current_date = datetime.now()
+        # Per-weekday and per-month factors, indexed below for every forecast day at once
+        base_by_weekday = np.array([daily_patterns.get(day, 25.0) for day in range(7)])  # kWh default
         
-        for day in range(days_ahead):
-            prediction_date = current_date + timedelta(days=day)
-            day_of_week = prediction_date.weekday()
-            
-            # Base prediction from historical patterns
-            base_usage = daily_patterns.get(day_of_week, 25.0)  # kWh default
-            
-            # Apply seasonal adjustments
-            seasonal_multiplier = seasonal_factors.get(prediction_date.month, 1.0)
-            predicted_usage = base_usage * seasonal_multiplier
-            
-            # Apply weather impact (simplified)
-            weather_impact = self._predict_weather_impact(prediction_date)
-            predicted_usage *= weather_impact
-            
-            # Calculate cost (UK average: £0.28 per kWh)
-            predicted_cost = predicted_usage * 0.28
-            
-            predictions[prediction_date.strftime('%Y-%m-%d')] = {
-                'predicted_usage_kwh': round(predicted_usage, 2),
-                'predicted_cost_gbp': round(predicted_cost, 2),
+        dates = np.datetime64(datetime.now().date(), 'D') + np.arange(days_ahead)
+        months = dates.astype('datetime64[M]').astype(np.int64) % 12  # 0 is January
+        weekdays = (dates.astype(np.int64) + EPOCH_WEEKDAY) % 7
+        
+        # Base prediction from historical patterns, with seasonal and (simplified) weather adjustments
+        base_usage = base_by_weekday[weekdays]
+        seasonal_multiplier = self._get_seasonal_energy_factors()[months]
+        weather_impact = WEATHER_IMPACT_FACTORS[months]
+        predicted_usage = base_usage * seasonal_multiplier * weather_impact
+        
+        # Calculate cost (UK average: £0.28 per kWh)
+        predicted_cost = predicted_usage * 0.28
+        
+        # Reported figures are rounded first; the totals and the peak are taken over the rounded values
+        date_keys = dates.astype(str).tolist()
+        usage_kwh = [round(usage, 2) for usage in predicted_usage.tolist()]
+        cost_gbp = [round(cost, 2) for cost in predicted_cost.tolist()]
+        
+        predictions = {}
+        for date, base, seasonal, weather, usage, cost in zip(
+            date_keys, base_usage.tolist(), seasonal_multiplier.tolist(), weather_impact.tolist(), usage_kwh, cost_gbp
+        ):
+            predictions[date] = {
+                'predicted_usage_kwh': usage,
+                'predicted_cost_gbp': cost,
                 'confidence': 0.75,  # Based on data quality
                 'factors': {
-                    'base_usage': base_usage,
-                    'seasonal_multiplier': seasonal_multiplier,
-                    'weather_impact': weather_impact
+                    'base_usage': base,
+                    'seasonal_multiplier': seasonal,
+                    'weather_impact': weather
                 }
             }
         
         return {
             'predictions': predictions,
-            'total_predicted_usage': sum(p['predicted_usage_kwh'] for p in predictions.values()),
-            'total_predicted_cost': sum(p['predicted_cost_gbp'] for p in predictions.values()),
-            'average_daily_usage': statistics.mean([p['predicted_usage_kwh'] for p in predictions.values()]),
-            'peak_usage_day': max(predictions.keys(), key=lambda k: predictions[k]['predicted_usage_kwh'])
+            'total_predicted_usage': sum(usage_kwh),
+            'total_predicted_cost': sum(cost_gbp),
+            'average_daily_usage': float(np.mean(usage_kwh)),
+            'peak_usage_day': date_keys[int(np.argmax(usage_kwh))]
         }
     
     def generate_life_optimizations(self, user_id: str) -> List[LifeOptimization]:
         """Generate personalized life optimization suggestions"""
-        optimizations = []
-        
-        # Energy optimization
-        energy_opt = self._generate_energy_optimization(user_id)
-        if energy_opt:
-            optimizations.append(energy_opt)
-        
-        # Time optimization
-        time_opt = self._generate_time_optimization(user_id)
-        if time_opt:
-            optimizations.append(time_opt)
-        
-        # Comfort optimization
-        comfort_opt = self._generate_comfort_optimization(user_id)
-        if comfort_opt:
-            optimizations.append(comfort_opt)
-        
-        # Cost optimization
-        cost_opt = self._generate_cost_optimization(user_id)
-        if cost_opt:
-            optimizations.append(cost_opt)
-        
-        # Health optimization
-        health_opt = self._generate_health_optimization(user_id)
-        if health_opt:
-            optimizations.append(health_opt)
+        # Each generator only builds a dataclass; they run inline since a thread pool would cost more than the work
+        generators = (
+            self._generate_energy_optimization,
+            self._generate_time_optimization,
+            self._generate_comfort_optimization,
+            self._generate_cost_optimization,
+            self._generate_health_optimization,
+        )
+        optimizations = [opt for opt in (generate(user_id) for generate in generators) if opt]
         
         # Sort by priority score
         optimizations.sort(key=lambda x: x.priority_score, reverse=True)
@@ -470,32 +881,14 @@ class PredictiveManager:
             )
         }
     
-    def _calculate_efficiency_trend(self, usage_data: List[Dict]) -> float:
-        """Calculate device efficiency trend (0-1, where 1 is improving)"""
-        if len(usage_data) < 10:
-            return 0.5
-        
-        energy_values = [d.get('energy', 0) for d in usage_data if d.get('energy')]
-        if len(energy_values) < 5:
-            return 0.5
-        
-        # Simple linear trend analysis
-        x = list(range(len(energy_values)))
-        slope = np.polyfit(x, energy_values, 1)[0]
-        
-        # Normalize slope to 0-1 range (negative slope = improving efficiency)
-        return max(0, min(1, 0.5 - slope * 0.1))
-    
-    def _calculate_frequency_change(self, usage_data: List[Dict]) -> float:
+    def _calculate_frequency_change(self, event_count: int) -> float:
         """Calculate change in usage frequency (0-1)"""
-        if len(usage_data) < 20:
+        if event_count < 20:
             return 0.0
         
-        recent_period = usage_data[-10:]
-        older_period = usage_data[-20:-10]
-        
-        recent_freq = len(recent_period) / 10
-        older_freq = len(older_period) / 10
+        # Events in the last ten and the ten before them
+        recent_freq = min(event_count, 10) / 10
+        older_freq = min(event_count - 10, 10) / 10
         
         if older_freq == 0:
             return 0.0
@@ -503,53 +896,31 @@ class PredictiveManager:
         change = abs(recent_freq - older_freq) / older_freq
         return min(1.0, change)
     
-    def _calculate_error_rate(self, usage_data: List[Dict]) -> float:
-        """Calculate error rate from usage data"""
-        if not usage_data:
-            return 0.0
-        
-        error_count = sum(1 for d in usage_data if d.get('context') and 'error' in d['context'].lower())
-        return min(1.0, error_count / len(usage_data))
-    
     def _estimate_replacement_cost(self, device_id: str) -> float:
         """Estimate replacement cost for device"""
         # Simplified cost estimation based on device type
-        cost_map = {
-            'light': 25.0,
-            'thermostat': 150.0,
-            'camera': 100.0,
-            'plug': 15.0,
-            'speaker': 50.0,
-            'vacuum': 200.0
-        }
-        
-        for device_type, cost in cost_map.items():
-            if device_type in device_id.lower():
-                return cost
-        
-        return 75.0  # Default estimate
+        return _replacement_cost(device_id)
     
     def _estimate_maintenance_cost(self, device_id: str) -> float:
         """Estimate preventive maintenance cost"""
-        replacement_cost = self._estimate_replacement_cost(device_id)
-        return replacement_cost * 0.15  # Maintenance typically 15% of replacement cost
+        return _replacement_cost(device_id) * MAINTENANCE_COST_RATIO
     
     def _analyze_wake_sleep_pattern(self, activity_data: List[Dict]) -> Optional[BehaviorPattern]:
         """Analyze wake/sleep patterns"""
-        wake_times = []
-        sleep_times = []
-        
-        for activity in activity_data:
-            if activity['activity'] == 'wake_up':
-                wake_times.append(activity['timestamp'].hour + activity['timestamp'].minute / 60)
-            elif activity['activity'] == 'sleep':
-                sleep_times.append(activity['timestamp'].hour + activity['timestamp'].minute / 60)
+        columns = np.fromiter(
+            ((activity['activity_id'], activity['timestamp'].hour, activity['timestamp'].minute)
+             for activity in activity_data),
+            dtype=ACTIVITY_TIME_DTYPE, count=len(activity_data)
+        )
+        hours = columns['hour'] + columns['minute'] / 60
+        wake_times = hours[columns['activity_id'] == self._activity_ids.get('wake_up', -1)]
+        sleep_times = hours[columns['activity_id'] == self._activity_ids.get('sleep', -1)]
         
         if len(wake_times) < 7:  # Need at least a week of data
             return None
         
-        avg_wake_time = statistics.mean(wake_times)
-        wake_consistency = 1.0 - (statistics.stdev(wake_times) / 24.0) if len(wake_times) > 1 else 1.0
+        avg_wake_time = float(np.mean(wake_times))
+        wake_consistency = 1.0 - (float(np.std(wake_times, ddof=1)) / 24.0) if len(wake_times) > 1 else 1.0
         
         return BehaviorPattern(
             id=f"wake_pattern_{int(time.time())}",
@@ -558,7 +929,7 @@ class PredictiveManager:
             pattern_data={
                 'average_wake_time': avg_wake_time,
                 'wake_consistency': wake_consistency,
-                'sleep_times': sleep_times[-7:] if sleep_times else []
+                'sleep_times': sleep_times[-7:].tolist()
             },
             confidence=wake_consistency,
             last_updated=datetime.now(),
@@ -572,10 +943,13 @@ class PredictiveManager:
         patterns = []
         device_usage = defaultdict(list)
         
-        # Group activities by device interaction
+        # Group activities by device interaction; the device is parsed from the context when logged
         for activity in activity_data:
-            if 'device' in activity.get('context', ''):
-                device_id = activity['context'].split('device:')[1].split(',')[0]
+            if 'device_id' in activity:
+                device_id = activity['device_id']
+            else:
+                device_id = self._context_device_id(activity.get('context'))
+            if device_id is not None:
                 device_usage[device_id].append(activity)
         
         for device_id, usage_events in device_usage.items():
@@ -583,8 +957,11 @@ class PredictiveManager:
                 continue
             
             # Analyze usage times
-            usage_hours = [event['timestamp'].hour for event in usage_events]
-            peak_hour = max(set(usage_hours), key=usage_hours.count)
+            usage_hours = np.fromiter((event['timestamp'].hour for event in usage_events),
+                                      dtype=np.int64, count=len(usage_events))
+            hour_counts = np.bincount(usage_hours, minlength=24)
+            peak_hour = int(hour_counts.argmax())
+            active_hours = np.flatnonzero(hour_counts)
             
             pattern = BehaviorPattern(
                 id=f"device_pattern_{device_id}_{int(time.time())}",
@@ -594,7 +971,7 @@ class PredictiveManager:
                     'device_id': device_id,
                     'peak_usage_hour': peak_hour,
                     'usage_frequency': len(usage_events),
-                    'usage_distribution': dict(zip(*np.unique(usage_hours, return_counts=True)))
+                    'usage_distribution': dict(zip(active_hours.tolist(), hour_counts[active_hours].tolist()))
                 },
                 confidence=0.8,
                 last_updated=datetime.now(),
@@ -621,7 +998,7 @@ class PredictiveManager:
             
             # Analyze time spent in location
             durations = [a.get('duration', 0) for a in activities if a.get('duration')]
-            avg_duration = statistics.mean(durations) if durations else 0
+            avg_duration = float(np.mean(durations)) if durations else 0
             
             pattern = BehaviorPattern(
                 id=f"location_pattern_{location}_{int(time.time())}",
@@ -653,7 +1030,7 @@ class PredictiveManager:
             daily_routines[day_key].append(activity)
         
         # Find common sequences
-        common_sequences = self._find_common_sequences(daily_routines)
+        common_sequences = self._find_common_sequences(daily_routines, min_frequency=3)
         
         patterns = []
         for sequence, frequency in common_sequences.items():
@@ -681,39 +1058,62 @@ class PredictiveManager:
     
     def _find_peak_times(self, timestamps: List[datetime]) -> List[int]:
         """Find peak usage hours"""
-        hours = [ts.hour for ts in timestamps]
-        hour_counts = defaultdict(int)
-        for hour in hours:
-            hour_counts[hour] += 1
+        hours = np.fromiter((ts.hour for ts in timestamps), dtype=np.int64, count=len(timestamps))
+        hour_counts = np.bincount(hours, minlength=24)
+        
+        # Ties go to the hour seen first, as with a stable sort over first-seen order
+        first_seen = np.full(24, len(hours), dtype=np.int64)
+        np.minimum.at(first_seen, hours, np.arange(len(hours)))
         
         # Return top 3 peak hours
-        return sorted(hour_counts.keys(), key=lambda h: hour_counts[h], reverse=True)[:3]
+        ranked = np.lexsort((first_seen, -hour_counts))
+        return ranked[:min(3, np.count_nonzero(hour_counts))].tolist()
     
-    def _find_common_sequences(self, daily_routines: Dict[str, List[Dict]]) -> Dict[str, int]:
+    def _find_common_sequences(self, daily_routines: Dict[str, List[Dict]],
+                               min_frequency: int = 1) -> Dict[Tuple[str, str, str], int]:
         """Find common activity sequences"""
-        sequences = defaultdict(int)
-        
+        # Every window of 3 consecutive activity ids becomes one packed integer key
+        day_keys = []
         for day, activities in daily_routines.items():
             if len(activities) < 3:
                 continue
             
-            # Create sequences of 3 consecutive activities
-            for i in range(len(activities) - 2):
-                sequence = tuple(a['activity'] for a in activities[i:i+3])
-                sequences[sequence] += 1
+            ids = np.fromiter((a['activity_id'] for a in activities), dtype=np.int64, count=len(activities))
+            day_keys.append((ids[:-2] * SEQUENCE_ID_BASE + ids[1:-1]) * SEQUENCE_ID_BASE + ids[2:])
         
-        return dict(sequences)
+        if not day_keys:
+            return {}
+        
+        keys, first_seen, counts = np.unique(np.concatenate(day_keys), return_index=True, return_counts=True)
+        
+        # Only frequent keys are unpacked back into names, in order of first occurrence
+        names = self._activity_names
+        sequences = {}
+        for i in np.argsort(first_seen):
+            if counts[i] < min_frequency:
+                continue
+            head, third = divmod(int(keys[i]), SEQUENCE_ID_BASE)
+            first, second = divmod(head, SEQUENCE_ID_BASE)
+            sequences[(names[first], names[second], names[third])] = int(counts[i])
+        
+        return sequences
     
     def _analyze_daily_energy_patterns(self) -> Dict[int, float]:
         """Analyze daily energy usage patterns by day of week"""
-        daily_usage = defaultdict(list)
-        
+        weekdays = []
+        usage = []
         for entry in self.energy_usage_history:
             if 'timestamp' in entry and 'usage' in entry:
-                day_of_week = entry['timestamp'].weekday()
-                daily_usage[day_of_week].append(entry['usage'])
+                weekdays.append(entry['timestamp'].weekday())
+                usage.append(entry['usage'])
         
-        return {day: statistics.mean(usage) for day, usage in daily_usage.items() if usage}
+        if not usage:
+            return {}
+        
+        # Per-weekday totals and counts in two C-level passes
+        totals = np.bincount(weekdays, weights=usage, minlength=7)
+        counts = np.bincount(weekdays, minlength=7)
+        return {day: float(totals[day] / counts[day]) for day in range(7) if counts[day]}
     
     def _analyze_weekly_energy_patterns(self) -> Dict[str, float]:
         """Analyze weekly energy patterns"""
@@ -725,202 +1125,39 @@ class PredictiveManager:
             'low_day': 'Wednesday'
         }
     
-    def _get_seasonal_energy_factors(self) -> Dict[int, float]:
-        """Get seasonal energy usage multipliers by month"""
-        return {
-            1: 1.4,   # January - high heating
-            2: 1.3,   # February
-            3: 1.1,   # March
-            4: 1.0,   # April
-            5: 0.9,   # May
-            6: 0.8,   # June
-            7: 0.8,   # July
-            8: 0.8,   # August
-            9: 0.9,   # September
-            10: 1.0,  # October
-            11: 1.2,  # November
-            12: 1.4   # December - high heating
-        }
+    def _get_seasonal_energy_factors(self) -> np.ndarray:
+        """Get seasonal energy usage multipliers, indexed by month - 1"""
+        return SEASONAL_ENERGY_FACTORS
     
     def _predict_weather_impact(self, date: datetime) -> float:
         """Predict weather impact on energy usage"""
         # Simplified weather impact (would integrate with weather API in production)
-        month = date.month
-        
-        # London weather patterns
-        if month in [12, 1, 2]:  # Winter
-            return 1.2  # Higher usage due to heating
-        elif month in [6, 7, 8]:  # Summer
-            return 0.9  # Lower usage, minimal cooling needed
-        else:
-            return 1.0  # Moderate usage
+        return float(WEATHER_IMPACT_FACTORS[date.month - 1])
     
     def _generate_energy_optimization(self, user_id: str) -> Optional[LifeOptimization]:
         """Generate energy optimization suggestions"""
-        current_usage = 25.0  # kWh/day average
-        optimized_usage = 18.0  # Potential optimized usage
-        
-        return LifeOptimization(
-            id=f"energy_opt_{user_id}_{int(time.time())}",
-            category="energy",
-            current_state={
-                'daily_usage_kwh': current_usage,
-                'monthly_cost_gbp': current_usage * 30 * 0.28,
-                'efficiency_score': 65
-            },
-            optimized_state={
-                'daily_usage_kwh': optimized_usage,
-                'monthly_cost_gbp': optimized_usage * 30 * 0.28,
-                'efficiency_score': 85
-            },
-            improvement_percentage=28.0,
-            implementation_steps=[
-                "Install smart thermostats with learning algorithms",
-                "Upgrade to LED lighting with motion sensors",
-                "Add smart power strips to eliminate phantom loads",
-                "Implement time-of-use energy scheduling",
-                "Install smart water heater controller"
-            ],
-            estimated_savings={
-                'money_monthly_gbp': (current_usage - optimized_usage) * 30 * 0.28,
-                'energy_monthly_kwh': (current_usage - optimized_usage) * 30,
-                'co2_monthly_kg': (current_usage - optimized_usage) * 30 * 0.233
-            },
-            difficulty_level="medium",
-            priority_score=8.5
-        )
+        return LifeOptimization(id=f"energy_opt_{user_id}_{int(time.time())}", **ENERGY_OPTIMIZATION_TEMPLATE)
     
     def _generate_time_optimization(self, user_id: str) -> Optional[LifeOptimization]:
         """Generate time-saving optimization suggestions"""
-        return LifeOptimization(
-            id=f"time_opt_{user_id}_{int(time.time())}",
-            category="time",
-            current_state={
-                'daily_manual_tasks_minutes': 120,
-                'automation_level': 30
-            },
-            optimized_state={
-                'daily_manual_tasks_minutes': 45,
-                'automation_level': 80
-            },
-            improvement_percentage=62.5,
-            implementation_steps=[
-                "Automate morning routine with smart lighting and coffee maker",
-                "Install robotic vacuum with scheduling",
-                "Set up automated grocery ordering based on consumption",
-                "Implement voice-controlled home management",
-                "Add smart locks and security automation"
-            ],
-            estimated_savings={
-                'time_daily_minutes': 75,
-                'time_monthly_hours': 37.5,
-                'time_yearly_hours': 456
-            },
-            difficulty_level="easy",
-            priority_score=9.0
-        )
+        return LifeOptimization(id=f"time_opt_{user_id}_{int(time.time())}", **TIME_OPTIMIZATION_TEMPLATE)
     
     def _generate_comfort_optimization(self, user_id: str) -> Optional[LifeOptimization]:
         """Generate comfort optimization suggestions"""
-        return LifeOptimization(
-            id=f"comfort_opt_{user_id}_{int(time.time())}",
-            category="comfort",
-            current_state={
-                'temperature_consistency': 70,
-                'lighting_quality': 65,
-                'air_quality_score': 75,
-                'noise_level': 60
-            },
-            optimized_state={
-                'temperature_consistency': 95,
-                'lighting_quality': 90,
-                'air_quality_score': 90,
-                'noise_level': 85
-            },
-            improvement_percentage=25.0,
-            implementation_steps=[
-                "Install zoned climate control system",
-                "Add circadian rhythm lighting",
-                "Implement air quality monitoring and purification",
-                "Install sound masking and noise reduction",
-                "Add humidity control automation"
-            ],
-            estimated_savings={
-                'comfort_score_improvement': 25,
-                'sleep_quality_improvement': 20,
-                'productivity_improvement': 15
-            },
-            difficulty_level="medium",
-            priority_score=7.5
-        )
+        return LifeOptimization(id=f"comfort_opt_{user_id}_{int(time.time())}", **COMFORT_OPTIMIZATION_TEMPLATE)
     
     def _generate_cost_optimization(self, user_id: str) -> Optional[LifeOptimization]:
         """Generate cost optimization suggestions"""
-        return LifeOptimization(
-            id=f"cost_opt_{user_id}_{int(time.time())}",
-            category="cost",
-            current_state={
-                'monthly_utilities_gbp': 180,
-                'monthly_maintenance_gbp': 50,
-                'monthly_waste_gbp': 25
-            },
-            optimized_state={
-                'monthly_utilities_gbp': 135,
-                'monthly_maintenance_gbp': 30,
-                'monthly_waste_gbp': 10
-            },
-            improvement_percentage=30.0,
-            implementation_steps=[
-                "Implement dynamic energy pricing optimization",
-                "Add predictive maintenance to prevent costly repairs",
-                "Install water usage monitoring and leak detection",
-                "Optimize heating/cooling schedules",
-                "Implement bulk buying coordination with neighbors"
-            ],
-            estimated_savings={
-                'money_monthly_gbp': 80,
-                'money_yearly_gbp': 960
-            },
-            difficulty_level="medium",
-            priority_score=8.8
-        )
+        return LifeOptimization(id=f"cost_opt_{user_id}_{int(time.time())}", **COST_OPTIMIZATION_TEMPLATE)
     
     def _generate_health_optimization(self, user_id: str) -> Optional[LifeOptimization]:
         """Generate health optimization suggestions"""
-        return LifeOptimization(
-            id=f"health_opt_{user_id}_{int(time.time())}",
-            category="health",
-            current_state={
-                'air_quality_score': 75,
-                'sleep_environment_score': 70,
-                'activity_encouragement': 40,
-                'stress_reduction': 60
-            },
-            optimized_state={
-                'air_quality_score': 95,
-                'sleep_environment_score': 90,
-                'activity_encouragement': 80,
-                'stress_reduction': 85
-            },
-            improvement_percentage=30.0,
-            implementation_steps=[
-                "Install comprehensive air quality monitoring",
-                "Optimize bedroom environment for sleep quality",
-                "Add activity reminders and standing desk automation",
-                "Implement stress-reducing lighting and sound",
-                "Monitor and optimize indoor plant ecosystem"
-            ],
-            estimated_savings={
-                'health_score_improvement': 30,
-                'sleep_quality_improvement': 25,
-                'stress_reduction_percentage': 20
-            },
-            difficulty_level="easy",
-            priority_score=8.0
-        )
+        return LifeOptimization(id=f"health_opt_{user_id}_{int(time.time())}", **HEALTH_OPTIMIZATION_TEMPLATE)
     
     def start_prediction_engine(self):
         """Start the prediction engine with scheduled tasks"""
+        _warm_up_kernels()
+        
         def run_predictions():
             while True:
                 schedule.run_pending()
@@ -944,7 +1181,7 @@ class PredictiveManager:
         for device_id in iot_controller.devices.keys():
             prediction = self.analyze_device_failure_patterns(device_id)
             if prediction:
-                self.predictions[prediction.id] = prediction
+                self._store_prediction(prediction)
                 self.save_prediction(prediction)
                 logging.info(f"Generated failure prediction for {device_id}")
     
@@ -955,7 +1192,7 @@ class PredictiveManager:
         for user_id in user_ids:
             patterns = self.analyze_behavioral_patterns(user_id)
             for pattern in patterns:
-                self.behavior_patterns[pattern.id] = pattern
+                self._store_behavior_pattern(pattern)
                 self.save_behavior_pattern(pattern)
             
             if patterns:
@@ -972,7 +1209,7 @@ class PredictiveManager:
         
         for user_id in user_ids:
             optimizations = self.generate_life_optimizations(user_id)
-            self.life_optimizations.extend(optimizations)
+            self._add_life_optimizations(optimizations)
             
             for opt in optimizations:
                 self.save_life_optimization(opt)
@@ -980,70 +1217,51 @@ class PredictiveManager:
             logging.info(f"Generated {len(optimizations)} optimizations for {user_id}")
     
     def save_prediction(self, prediction: Prediction):
-        """Save prediction to database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO predictions 
-            (id, prediction_type, target, predicted_event, confidence, predicted_date, 
-             impact_level, recommended_actions, cost_impact, prevention_cost, created_date, accuracy_score)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        """Queue a prediction save"""
+        self._writer.put(SAVE_PREDICTION_SQL, self._prediction_row(prediction))
+    
+    def save_behavior_pattern(self, pattern: BehaviorPattern):
+        """Queue a behavior pattern save"""
+        self._writer.put(SAVE_BEHAVIOR_PATTERN_SQL, self._behavior_pattern_row(pattern))
+    
+    def save_life_optimization(self, optimization: LifeOptimization):
+        """Queue a life optimization save"""
+        self._writer.put(SAVE_LIFE_OPTIMIZATION_SQL, self._life_optimization_row(optimization))
+    
+    @staticmethod
+    def _prediction_row(prediction: Prediction) -> Tuple:
+        """Convert a prediction to its predictions row"""
+        return (
             prediction.id, prediction.prediction_type.value, prediction.target,
             prediction.predicted_event, prediction.confidence, prediction.predicted_date,
-            prediction.impact_level, json.dumps(prediction.recommended_actions),
+            prediction.impact_level, _dumps(prediction.recommended_actions),
             prediction.cost_impact, prediction.prevention_cost, prediction.created_date,
             prediction.accuracy_score
-        ))
-        
-        conn.commit()
-        conn.close()
+        )
     
-    def save_behavior_pattern(self, pattern: BehaviorPattern):
-        """Save behavior pattern to database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO behavior_patterns 
-            (id, user_id, pattern_type, pattern_data, confidence, last_updated, 
-             frequency, seasonal_variation, automation_potential)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+    @staticmethod
+    def _behavior_pattern_row(pattern: BehaviorPattern) -> Tuple:
+        """Convert a behavior pattern to its behavior_patterns row"""
+        return (
             pattern.id, pattern.user_id, pattern.pattern_type,
-            json.dumps(pattern.pattern_data), pattern.confidence, pattern.last_updated,
+            _dumps(pattern.pattern_data), pattern.confidence, pattern.last_updated,
             pattern.frequency, pattern.seasonal_variation, pattern.automation_potential
-        ))
-        
-        conn.commit()
-        conn.close()
+        )
     
-    def save_life_optimization(self, optimization: LifeOptimization):
-        """Save life optimization to database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO life_optimizations 
-            (id, category, current_state, optimized_state, improvement_percentage, 
-             implementation_steps, estimated_savings, difficulty_level, priority_score, created_date)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            optimization.id, optimization.category, json.dumps(optimization.current_state),
-            json.dumps(optimization.optimized_state), optimization.improvement_percentage,
-            json.dumps(optimization.implementation_steps), json.dumps(optimization.estimated_savings),
+    @staticmethod
+    def _life_optimization_row(optimization: LifeOptimization) -> Tuple:
+        """Convert a life optimization to its life_optimizations row, stamped with the save time"""
+        return (
+            optimization.id, optimization.category, _dumps(optimization.current_state),
+            _dumps(optimization.optimized_state), optimization.improvement_percentage,
+            _dumps(optimization.implementation_steps), _dumps(optimization.estimated_savings),
             optimization.difficulty_level, optimization.priority_score, datetime.now()
-        ))
-        
-        conn.commit()
-        conn.close()
+        )
     
     def load_data(self):
         """Load existing data from database"""
         # Load predictions
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self._conn.cursor()
         
         cursor.execute('SELECT * FROM predictions')
         for row in cursor.fetchall():
@@ -1055,37 +1273,91 @@ class PredictiveManager:
                 confidence=row[4],
                 predicted_date=datetime.fromisoformat(row[5]),
                 impact_level=row[6],
-                recommended_actions=json.loads(row[7]),
+                recommended_actions=tuple(_loads(row[7])),
                 cost_impact=row[8],
                 prevention_cost=row[9],
                 created_date=datetime.fromisoformat(row[10]),
                 accuracy_score=row[11]
             )
-            self.predictions[prediction.id] = prediction
+            self._store_prediction(prediction)
         
-        conn.close()
         logging.info(f"Loaded {len(self.predictions)} predictions from database")
     
+    def _store_prediction(self, prediction: Prediction):
+        """Store a prediction and keep the dashboard counts in step"""
+        previous = self.predictions.get(prediction.id)
+        self.predictions[prediction.id] = prediction
+        self._prediction_views[prediction.id] = {field.name: getattr(prediction, field.name) for field in PREDICTION_FIELDS}
+        if previous is not None:
+            self._track_prediction(previous, -1)
+        self._track_prediction(prediction)
+    
+    def record_prediction_accuracy(self, prediction_id: str, accuracy_score: float) -> Optional[Prediction]:
+        """Record how accurate a prediction turned out, replacing the stored prediction"""
+        prediction = self.predictions.get(prediction_id)
+        if prediction is None:
+            return None
+        
+        prediction = replace(prediction, accuracy_score=accuracy_score)
+        self._store_prediction(prediction)
+        self.save_prediction(prediction)
+        return prediction
+    
+    def _store_behavior_pattern(self, pattern: BehaviorPattern):
+        """Store a behavior pattern and keep the dashboard counts in step"""
+        previous = self.behavior_patterns.get(pattern.id)
+        self.behavior_patterns[pattern.id] = pattern
+        if previous is not None:
+            self._track_behavior_pattern(previous, -1)
+        self._track_behavior_pattern(pattern)
+    
+    def _add_life_optimizations(self, optimizations: List[LifeOptimization]):
+        """Append life optimizations and keep the dashboard counts in step"""
+        self.life_optimizations.extend(optimizations)
+        for optimization in optimizations:
+            self._track_life_optimization(optimization)
+    
+    def _track_prediction(self, prediction: Prediction, sign: int = 1):
+        """Add (sign=1) or remove (sign=-1) a prediction's share of the dashboard counts"""
+        with self._agg_lock:
+            self._agg["pred_high"] += sign * (prediction.impact_level == 'high')
+    
+    def _track_behavior_pattern(self, pattern: BehaviorPattern, sign: int = 1):
+        """Add (sign=1) or remove (sign=-1) a behavior pattern's share of the dashboard counts"""
+        agg = self._agg
+        with self._agg_lock:
+            agg["bp_high_conf"] += sign * (pattern.confidence > 0.8)
+            agg["bp_auto_ready"] += sign * ('High' in pattern.automation_potential)
+    
+    def _track_life_optimization(self, optimization: LifeOptimization, sign: int = 1):
+        """Add (sign=1) or remove (sign=-1) a life optimization's share of the dashboard counts"""
+        agg = self._agg
+        with self._agg_lock:
+            agg["opt_high"] += sign * (optimization.priority_score > 8.0)
+            agg["opt_savings"] += sign * optimization.estimated_savings.get('money_monthly_gbp', 0)
+    
     def get_dashboard_data(self) -> Dict[str, Any]:
         """Get comprehensive dashboard data"""
+        with self._agg_lock:
+            agg = dict(self._agg)
+        
         return {
             'predictions': {
                 'total': len(self.predictions),
-                'high_priority': len([p for p in self.predictions.values() if p.impact_level == 'high']),
-                'recent': [asdict(p) for p in sorted(self.predictions.values(), 
-                                                   key=lambda x: x.created_date, reverse=True)[:5]]
+                'high_priority': agg["pred_high"],
+                # Shallow copies, so callers editing the dashboard cannot touch the stored views
+                'recent': [dict(self._prediction_views[p.id]) for p in heapq.nlargest(5, self.predictions.values(),
+                                                                                     key=lambda x: x.created_date)]
             },
             'behavior_patterns': {
                 'total': len(self.behavior_patterns),
-                'high_confidence': len([p for p in self.behavior_patterns.values() if p.confidence > 0.8]),
-                'automation_ready': len([p for p in self.behavior_patterns.values() 
-                                       if 'High' in p.automation_potential])
+                'high_confidence': agg["bp_high_conf"],
+                'automation_ready': agg["bp_auto_ready"]
             },
             'optimizations': {
                 'total': len(self.life_optimizations),
-                'high_priority': len([o for o in self.life_optimizations if o.priority_score > 8.0]),
-                'total_potential_savings': sum(o.estimated_savings.get('money_monthly_gbp', 0) 
-                                             for o in self.life_optimizations)
+                'high_priority': agg["opt_high"],
+                'total_potential_savings': agg["opt_savings"]
             },
             'energy_predictions': self.predict_energy_usage(7)
         }
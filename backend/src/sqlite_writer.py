@@ -0,0 +1,105 @@
+"""
+Queued SQLite Writer
+Background thread that commits single-row writes in batched transactions
+"""
+
+import atexit
+import time
+import queue
+import logging
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Longest the exit hook waits for queued rows, so a stuck database cannot hang interpreter shutdown
+EXIT_FLUSH_TIMEOUT = 5.0
+
+class QueuedWriter:
+    """Commit queued (statement, params) writes from one background thread, a batch per transaction"""
+
+    def __init__(self, db_path: str, pragmas: Iterable[str] = (), queue_size: int = 10000,
+                 batch_rows: int = 500, flush_interval: float = 0.1):
+        self.batch_rows = batch_rows
+        self.flush_interval = flush_interval  # seconds a partial batch may wait for more rows
+        self._q = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+
+        # The writer thread owns this connection; transactions are issued explicitly
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        for pragma in pragmas:
+            self._conn.execute(pragma)
+
+        # Daemon threads are only stopped after atexit handlers run, so queued rows still land
+        atexit.register(self.flush, EXIT_FLUSH_TIMEOUT)
+
+    def start(self):
+        """Start the writer thread"""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def running(self) -> bool:
+        """Whether the writer thread is alive to drain the queue"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def put(self, sql: str, params: Tuple):
+        """Queue one write; blocks only while the queue is full"""
+        self._q.put((sql, params))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued write has been committed; False if the writer is gone or time ran out"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._q.all_tasks_done:
+            while self._q.unfinished_tasks:
+                # Nothing will drain the queue without the thread, so waiting would never end
+                if not self.running:
+                    logger.warning("Writer thread is not running; %d queued rows were not written",
+                                   self._q.unfinished_tasks)
+                    return False
+                wait = 0.5 if deadline is None else min(0.5, deadline - time.monotonic())
+                if wait <= 0:
+                    logger.warning("Timed out with %d queued rows still unwritten", self._q.unfinished_tasks)
+                    return False
+                self._q.all_tasks_done.wait(wait)
+        return True
+
+    def _drain(self) -> List[Tuple[str, Tuple]]:
+        """Block for one queued write, then collect more until the batch is full or the interval ends"""
+        batch = [self._q.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_rows:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._q.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        """Commit each batch in one transaction, one executemany per statement"""
+        conn = self._conn
+        while True:
+            batch = self._drain()
+            rows_by_sql: Dict[str, List[Tuple]] = {}
+            for sql, params in batch:
+                rows_by_sql.setdefault(sql, []).append(params)
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                for sql, rows in rows_by_sql.items():
+                    conn.executemany(sql, rows)
+                conn.execute('COMMIT')
+            except Exception as e:
+                # Keep the thread alive whatever the batch did, including a failed rollback
+                logger.error("Failed to write %d queued rows: %s", len(batch), e)
+                try:
+                    if conn.in_transaction:
+                        conn.execute('ROLLBACK')
+                except Exception as rollback_error:
+                    logger.error("Rollback after failed write also failed: %s", rollback_error)
+            finally:
+                for _ in batch:
+                    self._q.task_done()